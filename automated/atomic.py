@@ -0,0 +1,44 @@
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+# Read once, from the main thread: os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8'):
+    """
+    Open a temporary file next to path that replaces path in one atomic step
+    when the with block finishes.
+
+    The temporary file gets the permissions of the file it replaces (or, for
+    a new file, the ones open() would give it), since mkstemp creates it
+    readable by its owner only. If the block raises, path is left untouched
+    and the temporary file is removed.
+
+    Args:
+        path (str): File to write
+        mode (str): 'w' for text or 'wb' for bytes
+        encoding (str): Encoding of a text file
+
+    Yields:
+        file: The open temporary file
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+        try:
+            permissions = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            permissions = 0o666 & ~_UMASK
+        os.chmod(tmp_path, permissions)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fitz  # PyMuPDF
+
+from bench_preprocess import REPO_DIR, SCRIPT_DIR, load_embedded_sample
+from final import (PARSER_VERSION, index_rounds, parse_round_results, preprocess_text, process_tournament_text,
+                   write_to_csv)
+from synthetic import REAL_LAYOUT, generate_draw
+from text import EXTRACTOR_VERSION, extract_text_from_pdf
+
+STAGES = ("extract", "preprocess", "parse_round_results", "matching", "write_to_csv")
+
+# Default regression threshold for --compare: 25% slower than the baseline
+DEFAULT_THRESHOLD = 1.25
+
+
+def bundled_inputs():
+    """
+    Return (name, pdf_path, text) for every bundled draw: the PDFs in
+    automated/downloads and scraper/, and the 2010 Ladies' draw embedded in
+    scraper/final.py, which has no PDF (pdf_path is None).
+    """
+    downloads = os.path.join(SCRIPT_DIR, 'downloads')
+    pdf_paths = [os.path.join(downloads, name) for name in sorted(os.listdir(downloads)) if name.endswith('.pdf')]
+    pdf_paths.append(os.path.join(REPO_DIR, 'scraper', '2008_QS_M.pdf'))
+    inputs = [(os.path.basename(pdf_path), pdf_path, None) for pdf_path in pdf_paths if os.path.exists(pdf_path)]
+    inputs.append(("2010_QS_W (embedded)", None, load_embedded_sample()))
+    return inputs
+
+
+def synthetic_inputs(sizes, formats=REAL_LAYOUT, seed=0):
+    """Return (name, None, text) for a synthetic draw of each size, see synthetic.generate_draw()."""
+    return [(f"synthetic_{size}", None, generate_draw(size, formats, seed).text) for size in sizes]
+
+
+def round_sections(text):
+    """Return the text of every result round (all rounds but the first) of a draw."""
+    order, round_lines = index_rounds(text)
+    return ['\n'.join(round_lines[name]) for name in dict.fromkeys(order) if name != "First Round"]
+
+
+def stage_functions(pdf_path, text, tmp_dir):
+    """
+    Return {stage: callable} for one input. Each callable runs its stage once
+    on prepared input, so only that stage is timed.
+
+    The parse and matching stages run on the line-per-entry text
+    extract_text_from_pdf produces (the pipeline's preprocess=False path);
+    preprocess_text is timed on its own.
+    """
+    if pdf_path is not None:
+        text = extract_text_from_pdf(pdf_path)
+    sections = round_sections(text)
+    matches = process_tournament_text(text, preprocess=False)
+    csv_path = os.path.join(tmp_dir, 'bench.csv')
+
+    def parse():
+        for section in sections:
+            parse_round_results(section)
+
+    def write():
+        # A fresh file each time, so every run writes the whole draw
+        for path in (csv_path, f"{csv_path}.index.json"):
+            if os.path.exists(path):
+                os.remove(path)
+        write_to_csv(matches, csv_path)
+
+    functions = {
+        "preprocess": lambda: preprocess_text(text),
+        "parse_round_results": parse,
+        # process_tournament_text includes parsing the rounds, which is
+        # subtracted to leave the matching loop, see run_benchmark()
+        "matching": lambda: process_tournament_text(text, preprocess=False),
+        "write_to_csv": write,
+    }
+    if pdf_path is not None:
+        functions = {"extract": lambda: extract_text_from_pdf(pdf_path), **functions}
+    return functions, len(text), len(matches)
+
+
+def time_stage(function, repeat):
+    """Run a stage repeat times and return the wall time of each run in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def peak_memory(function):
+    """Return the peak bytes allocated by Python while a stage runs once."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(times):
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "runs": len(times),
+    }
+
+
+def run_benchmark(inputs=None, repeat=5):
+    """
+    Time every stage of the pipeline on each input and measure its peak memory.
+
+    Timings and memory are taken in separate runs, since tracing allocations
+    slows the code down. The parser's progress output is discarded while a
+    stage runs, but its cost is still included in the timings.
+
+    Args:
+        inputs (list): (name, pdf_path, text) tuples, by default bundled_inputs()
+        repeat (int): Number of timed runs of each stage
+
+    Returns:
+        dict: Environment details and, for each input, the timing summary
+            (seconds) and peak_bytes of every stage
+    """
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pymupdf": fitz.VersionBind,
+        "extractor_version": EXTRACTOR_VERSION,
+        "parser_version": PARSER_VERSION,
+        "repeat": repeat,
+        "inputs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()) as log:
+        for name, pdf_path, text in inputs if inputs is not None else bundled_inputs():
+            functions, chars, match_count = stage_functions(pdf_path, text, tmp_dir)
+            stages = {}
+            for stage, function in functions.items():
+                function()  # warm up regex and font caches
+                stages[stage] = dict(summarize(time_stage(function, repeat)), peak_bytes=peak_memory(function))
+                log.seek(0)
+                log.truncate()
+            # Leave only the matching loop in the matching stage
+            parse_times = stages["parse_round_results"]
+            for key in ("min", "median", "mean"):
+                stages["matching"][key] = max(0.0, stages["matching"][key] - parse_times[key])
+            results["inputs"][name] = {"chars": chars, "matches": match_count, "stages": stages}
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare median stage times with a baseline run.
+
+    Args:
+        results (dict): Output of run_benchmark()
+        baseline (dict): Output of an earlier run_benchmark()
+        threshold (float): Ratio of current to baseline time counted as a regression
+
+    Returns:
+        list: (input, stage, baseline_seconds, seconds) for every regression
+    """
+    regressions = []
+    for name, entry in results["inputs"].items():
+        baseline_stages = baseline.get("inputs", {}).get(name, {}).get("stages", {})
+        for stage, summary in entry["stages"].items():
+            before = baseline_stages.get(stage, {}).get("median")
+            if before and summary["median"] > before * threshold:
+                regressions.append((name, stage, before, summary["median"]))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'input':<24}{'stage':<22}{'median ms':>11}{'min ms':>10}{'peak KiB':>10}")
+    for name, entry in results["inputs"].items():
+        for stage in STAGES:
+            if stage in entry["stages"]:
+                summary = entry["stages"][stage]
+                print(f"{name:<24}{stage:<22}{summary['median'] * 1e3:>11.3f}{summary['min'] * 1e3:>10.3f}"
+                      f"{summary['peak_bytes'] / 1024:>10.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the draw pipeline")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--synthetic", help="also time synthetic draws of these sizes, e.g. 256,1024")
+    parser.add_argument("--compare", help="baseline JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    inputs = bundled_inputs()
+    if args.synthetic:
+        inputs += synthetic_inputs(int(size) for size in args.synthetic.split(','))
+    results = run_benchmark(inputs, repeat=args.repeat)
+    print_table(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, stage, before, after in regressions:
+            print(f"Regression: {name} {stage} {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+import timeit
+
+from final import load_embedded_sample, preprocess_text
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+
+
+def legacy_preprocess_text(text):
+    """The multi-pass preprocess_text this module benchmarks against."""
+    text = re.sub(r'\s+', ' ', text)
+    for header in ['First Round', 'Second Round', 'Third Round', 'Qualifiers']:
+        text = re.sub(f'({header})', r'\n\1\n', text)
+    text = re.sub(r'(\d+)\s*\.\s*', r'\1. ', text)
+    text = re.sub(r'\[\s*(\d+)\s*\]', r'[\1]', text)
+    text = text.replace('l/', '1/').replace('O/', '0/')
+    return text
+
+
+def load_bundled_texts():
+    """
+    Return {name: text} for the bundled draw PDFs and the embedded sample.
+    """
+    from text import extract_text_from_pdf
+
+    texts = {}
+    pdf_paths = [os.path.join(SCRIPT_DIR, 'downloads', name)
+                 for name in sorted(os.listdir(os.path.join(SCRIPT_DIR, 'downloads')))
+                 if name.endswith('.pdf')]
+    pdf_paths.append(os.path.join(REPO_DIR, 'scraper', '2008_QS_M.pdf'))
+    for pdf_path in pdf_paths:
+        texts[os.path.basename(pdf_path)] = extract_text_from_pdf(pdf_path)
+    texts['2010_QS_W (embedded)'] = load_embedded_sample()
+    return texts
+
+
+def main(number=200):
+    texts = load_bundled_texts()
+    print(f"{'input':<24}{'chars':>8}{'legacy us':>12}{'single-pass us':>16}{'speedup':>9}")
+    for name, text in texts.items():
+        if preprocess_text(text) != legacy_preprocess_text(text):
+            print(f"{name}: outputs differ")
+            return 1
+        legacy = timeit.timeit(lambda: legacy_preprocess_text(text), number=number) / number * 1e6
+        current = timeit.timeit(lambda: preprocess_text(text), number=number) / number * 1e6
+        print(f"{name:<24}{len(text):>8}{legacy:>12.1f}{current:>16.1f}{legacy / current:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+
+from atomic import atomic_write
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 digest of a file without reading it into memory at once.
+
+    Args:
+        path (str): Path to the file
+        chunk_size (int): Number of bytes read per chunk
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data):
+    """
+    Compute the SHA-256 digest of a PDF already in memory, without copying it.
+
+    Args:
+        data (bytes): Contents of the file, or any buffer (e.g. a memoryview)
+
+    Returns:
+        str: Hex digest of the contents, equal to hash_file() of the same file
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk, content-addressed cache of extracted PDF text and parsed match rows.
+
+    Entries are keyed by the SHA-256 of the PDF plus the extractor (and for rows,
+    parser) version, so changing either version string invalidates exactly the
+    entries it affects. The cache is kept under max_bytes by evicting the least
+    recently used entries; a hit refreshes the entry's modification time.
+    """
+
+    def __init__(self, cache_dir=".extraction_cache", max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, kind, *key_parts):
+        key = hashlib.sha256('\0'.join(key_parts).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.{kind}")
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = f.read()
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _write(self, path, data):
+        with atomic_write(path) as f:
+            f.write(data)
+        self.evict()
+
+    def get_text(self, pdf_hash, extractor_version):
+        """Return the cached text for a PDF, or None on a miss."""
+        return self._read(self._path('txt', pdf_hash, extractor_version))
+
+    def put_text(self, pdf_hash, extractor_version, text):
+        """Store the extracted text for a PDF."""
+        self._write(self._path('txt', pdf_hash, extractor_version), text)
+
+    def get_rows(self, pdf_hash, extractor_version, parser_version):
+        """Return the cached match rows for a PDF, or None on a miss."""
+        data = self._read(self._path('rows', pdf_hash, extractor_version, parser_version))
+        return json.loads(data) if data is not None else None
+
+    def put_rows(self, pdf_hash, extractor_version, parser_version, match_rows):
+        """Store the parsed match rows for a PDF."""
+        self._write(self._path('rows', pdf_hash, extractor_version, parser_version), json.dumps(match_rows))
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Evicted by another process sharing the cache
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,110 @@
+import os
+
+from final import CSV_HEADER, as_rows
+
+# Columns whose CSV text is converted to integers; "retired" and blanks become nulls
+INT_COLUMNS = {
+    "W_seed", "L_seed",
+    "W_set1", "W_set2", "W_set3", "W_set4", "W_set5", "W_set",
+    "L_set1", "L_set2", "L_set3", "L_set4", "L_set5", "L_set",
+}
+FLAG_COLUMNS = {
+    "W_Wc", "L_Wc",
+    "W_set1_p", "W_set2_p", "W_set3_p", "W_set4_p", "W_set5_p",
+    "L_set1_p", "L_set2_p", "L_set3_p", "L_set4_p", "L_set5_p",
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def match_schema():
+    """
+    Arrow schema for match rows: the CSV columns with typed scores and flags,
+    plus the year and gender partition columns.
+
+    Returns:
+        pyarrow.Schema: Schema used for every Parquet file
+    """
+    pa, _ = _require_pyarrow()
+    fields = []
+    for column in CSV_HEADER:
+        if column in INT_COLUMNS:
+            fields.append(pa.field(column, pa.int16()))
+        elif column in FLAG_COLUMNS:
+            fields.append(pa.field(column, pa.int8()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    fields.append(pa.field("retired", pa.bool_()))
+    fields.append(pa.field("year", pa.int16()))
+    fields.append(pa.field("gender", pa.string()))
+    return pa.schema(fields)
+
+
+def _to_int(value):
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def rows_to_table(match_rows):
+    """
+    Convert match rows from process_tournament_text into an Arrow table.
+
+    Args:
+        match_rows (list): Match records, or rows in CSV_HEADER column order
+
+    Returns:
+        pyarrow.Table: Table with match_schema()
+    """
+    pa, _ = _require_pyarrow()
+    schema = match_schema()
+    columns = {name: [] for name in schema.names}
+
+    for row in as_rows(match_rows):
+        for column, value in zip(CSV_HEADER, row):
+            if column in INT_COLUMNS:
+                columns[column].append(_to_int(value))
+            elif column in FLAG_COLUMNS:
+                columns[column].append(_to_int(value) or 0)
+            else:
+                columns[column].append(str(value))
+        columns["retired"].append("retired" in row)
+        year, gender = str(row[0]).split('_')[:2]
+        columns["year"].append(_to_int(year))
+        columns["gender"].append(gender)
+
+    return pa.table(columns, schema=schema)
+
+
+def write_to_parquet(match_rows, root_path="output_parquet"):
+    """
+    Write match rows as a Parquet dataset partitioned by year and gender.
+
+    Each call replaces the partitions it touches, so re-processing a year
+    rewrites that year's files instead of adding duplicates.
+
+    Args:
+        match_rows (list): Match records, or rows in CSV_HEADER column order
+        root_path (str): Directory of the dataset (year=YYYY/gender=X/...)
+    """
+    if not match_rows:
+        return
+    _, pq = _require_pyarrow()
+    os.makedirs(root_path, exist_ok=True)
+    pq.write_to_dataset(
+        rows_to_table(match_rows),
+        root_path=root_path,
+        partition_cols=["year", "gender"],
+        existing_data_behavior="delete_matching",
+    )
+    print(f"Data has been written to {root_path}")
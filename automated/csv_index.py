@@ -0,0 +1,263 @@
+import csv
+import hashlib
+import io
+import json
+import os
+
+from atomic import atomic_write
+
+
+def tournament_key(match_id):
+    """
+    Return the tournament a match belongs to, e.g. "2004_W" for "2004_W_128_1".
+
+    Args:
+        match_id (str): Match Id in the {year}_{gender}_{round}_{num} format
+
+    Returns:
+        str: The year and gender part of the Match Id
+    """
+    return '_'.join(str(match_id).split('_')[:2])
+
+
+def encode_rows(rows):
+    """Encode rows exactly as csv.writer writes them to a file opened with newline=""."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def row_digest(row):
+    """Short digest of a row, used to tell unchanged rows from corrected ones."""
+    return hashlib.sha1(encode_rows([row])).hexdigest()[:16]
+
+
+def _file_tail(path, size, length=64):
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - length))
+        return f.read(min(size, length)).hex()
+
+
+def _copy_range(src, dst, length, chunk_size=1024 * 1024):
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+class IncrementalCSVWriter:
+    """
+    Idempotent writer for match CSV files.
+
+    A sidecar index (output.csv.index.json) records, for every tournament
+    (year and gender) in the CSV, the byte range its rows occupy and a digest
+    of each Match Id's row. Writing rows that are already in the file is a
+    no-op, new tournaments are appended, and a tournament whose rows changed is
+    swapped out where it stands in a single atomic replace of the file.
+    Re-running a year therefore never duplicates rows or reorders the file.
+    """
+
+    def __init__(self, output_file, header, index_file=None):
+        self.output_file = output_file
+        self.header = list(header)
+        self.index_file = index_file or f"{output_file}.index.json"
+        self.index = self._load_index()
+
+    def _file_size(self):
+        return os.path.getsize(self.output_file) if os.path.exists(self.output_file) else 0
+
+    def _load_index(self):
+        size = self._file_size()
+        if size == 0:
+            return {"size": 0, "data_start": 0, "tail": "", "tournaments": {}}
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if (index["size"] <= size and index["data_start"] <= index["size"]
+                    and index["tail"] == _file_tail(self.output_file, index["size"])):
+                if index["size"] == size:
+                    return index
+                # Bytes past the indexed size are either rows appended without
+                # the index (write_to_csv(..., incremental=False)) or the torn
+                # last line of an interrupted write. Only the torn line is
+                # dropped; complete rows are kept and indexed.
+                with open(self.output_file, 'r+b') as f:
+                    f.seek(index["size"])
+                    end = index["size"] + f.read().rfind(b'\n') + 1
+                    if end < size:
+                        f.truncate(end)
+                if end == index["size"]:
+                    return index
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        print(f"Rebuilding Match Id index for {self.output_file}")
+        return self._rebuild_index()
+
+    def _save_index(self):
+        # The tail bytes let _load_index check that the CSV is the one indexed
+        self.index["tail"] = _file_tail(self.output_file, self.index["size"])
+        with atomic_write(self.index_file) as f:
+            json.dump(self.index, f)
+
+    def _rebuild_index(self):
+        """
+        Index a CSV written without an index. Duplicate Match Ids keep their
+        last occurrence and each tournament's rows are grouped together, so the
+        file is rewritten once.
+        """
+        with open(self.output_file, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or self.header
+            tournaments = {}
+            for row in reader:
+                if row and row[0]:
+                    tournaments.setdefault(tournament_key(row[0]), {})[row[0]] = row
+
+        self.index = {"size": 0, "data_start": 0, "tail": "", "tournaments": {}}
+        self._rewrite(header, [(key, list(rows.values())) for key, rows in tournaments.items()])
+        return self.index
+
+    def _rewrite(self, header, layout):
+        """
+        Atomically replace the CSV with the header and the tournaments of
+        layout, in order. Each entry is (key, rows): rows are written as
+        given, or, when rows is None, the tournament is copied byte-for-byte
+        from the current file. The header is copied too when it is None.
+        """
+        tournaments = {}
+        src = open(self.output_file, 'rb') if os.path.exists(self.output_file) else None
+        try:
+            with atomic_write(self.output_file, 'wb') as dst:
+                if header is None:
+                    _copy_range(src, dst, self.index["data_start"])
+                else:
+                    dst.write(encode_rows([header]))
+                data_start = dst.tell()
+
+                for key, rows in layout:
+                    start = dst.tell()
+                    if rows is None:
+                        entry = self.index["tournaments"][key]
+                        src.seek(entry["start"])
+                        _copy_range(src, dst, entry["end"] - entry["start"])
+                        tournaments[key] = {"start": start, "end": dst.tell(), "rows": entry["rows"]}
+                    else:
+                        dst.write(encode_rows(rows))
+                        tournaments[key] = {"start": start, "end": dst.tell(),
+                                            "rows": {str(row[0]): row_digest(row) for row in rows}}
+                size = dst.tell()
+        finally:
+            if src is not None:
+                src.close()
+
+        self.index = {"size": size, "data_start": data_start, "tournaments": tournaments}
+        self._save_index()
+
+    def write(self, match_rows):
+        """
+        Write match rows, skipping tournaments already written unchanged.
+
+        Rows are consumed lazily. Rows of a tournament that is not in the file
+        yet are appended as they arrive, so a generator of rows is streamed
+        straight to disk. Rows of a tournament already on file are collected
+        until that tournament ends and are treated as its complete set of rows:
+        if they differ from what is on file, the tournament is replaced. Each
+        tournament's rows must arrive together, as process_tournament_text
+        produces them.
+
+        Args:
+            match_rows (iterable): Match rows whose first column is the Match Id
+
+        Returns:
+            dict: Number of rows "written", "skipped" and "replaced"
+        """
+        stats = {"written": 0, "skipped": 0, "replaced": 0}
+        replaced = []
+        seen = set()
+        current_key = None
+        buffered = None
+        buffer = io.StringIO()
+        encoder = csv.writer(buffer)
+        f = None
+
+        try:
+            for row in match_rows:
+                key = tournament_key(row[0])
+                if key != current_key:
+                    self._finish_tournament(current_key, buffered, stats, replaced)
+                    if key in seen:
+                        raise ValueError(f"Rows for tournament {key} are not contiguous")
+                    seen.add(key)
+                    current_key = key
+                    if key in self.index["tournaments"]:
+                        buffered = []
+                    else:
+                        buffered = None
+                        if f is None:
+                            f = self._open_for_append()
+                        self.index["tournaments"][key] = {"start": f.tell(), "end": f.tell(), "rows": {}}
+
+                if buffered is not None:
+                    buffered.append(row)
+                    continue
+
+                # New tournament: encode and append the row right away, so
+                # readers see rows as soon as they are produced
+                encoder.writerow(row)
+                data = buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+                f.write(data)
+                f.flush()
+                entry = self.index["tournaments"][key]
+                entry["rows"][str(row[0])] = hashlib.sha1(data).hexdigest()[:16]
+                entry["end"] = f.tell()
+                stats["written"] += 1
+
+            self._finish_tournament(current_key, buffered, stats, replaced)
+            if f is None and self.index["size"] == 0:
+                f = self._open_for_append()
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+                self.index["size"] = f.tell()
+                f.close()
+                f = None
+                self._save_index()
+        except BaseException:
+            # Drop the rows appended since the last saved index
+            if f is not None:
+                f.truncate(self.index["size"])
+                f.close()
+            self.index = self._load_index()
+            raise
+
+        if replaced:
+            # Replaced tournaments are written where their old rows were, so
+            # the file keeps its order
+            replaced = dict(replaced)
+            order = sorted(self.index["tournaments"], key=lambda key: self.index["tournaments"][key]["start"])
+            self._rewrite(None, [(key, replaced.get(key)) for key in order])
+
+        return stats
+
+    def _finish_tournament(self, key, buffered, stats, replaced):
+        # Compare the collected rows of a tournament that was already on file
+        if buffered is None:
+            return
+        if self.index["tournaments"][key]["rows"] == {str(row[0]): row_digest(row) for row in buffered}:
+            stats["skipped"] += len(buffered)
+        else:
+            replaced.append((key, buffered))
+            stats["replaced"] += len(buffered)
+
+    def _open_for_append(self):
+        f = open(self.output_file, 'ab')
+        if self.index["size"] == 0:
+            f.write(encode_rows([self.header]))
+            self.index["data_start"] = f.tell()
+        return f
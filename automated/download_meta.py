@@ -0,0 +1,93 @@
+import json
+import os
+import re
+
+from atomic import atomic_write
+
+
+def meta_path(path):
+    """Path of the metadata sidecar of a downloaded file, e.g. 2002_QS_M.pdf.meta.json."""
+    return f"{path}.meta.json"
+
+
+def load_meta(path):
+    """
+    Return the sidecar metadata stored for a downloaded (or partial) file.
+
+    Args:
+        path (str): Path of the downloaded file
+
+    Returns:
+        dict: The url, etag, last_modified, content_length and sha256 recorded
+            for the file, or None if there is no readable sidecar
+    """
+    try:
+        with open(meta_path(path), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if isinstance(meta, dict) else None
+
+
+def save_meta(path, meta):
+    """Atomically write the sidecar metadata of a downloaded file."""
+    with atomic_write(meta_path(path)) as f:
+        json.dump(meta, f)
+
+
+def remove_meta(path):
+    """Remove the sidecar metadata of a file, if there is one."""
+    try:
+        os.remove(meta_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def response_validators(response):
+    """
+    Return the cache validators and full length of a 200 or 206 response.
+
+    Args:
+        response (requests.Response): Response to a GET request
+
+    Returns:
+        dict: etag, last_modified and content_length (None when not sent)
+    """
+    headers = response.headers
+    content_length = None
+    if response.status_code == 206:
+        # Content-Range: bytes 1000-4999/5000
+        if m := re.match(r'bytes \d+-\d+/(\d+)', headers.get('Content-Range', '')):
+            content_length = int(m.group(1))
+    elif headers.get('Content-Length', '').isdigit():
+        content_length = int(headers['Content-Length'])
+    return {
+        "etag": headers.get('ETag'),
+        "last_modified": headers.get('Last-Modified'),
+        "content_length": content_length,
+    }
+
+
+def conditional_headers(meta):
+    """Request headers that turn a GET into a conditional GET for a stored file."""
+    headers = {}
+    if meta.get("etag"):
+        headers['If-None-Match'] = meta["etag"]
+    if meta.get("last_modified"):
+        headers['If-Modified-Since'] = meta["last_modified"]
+    return headers
+
+
+def resume_headers(meta, offset):
+    """
+    Request headers that resume a partial download at offset.
+
+    If-Range makes the server send the whole file instead of a range when the
+    file changed since the partial download started.
+    """
+    etag = meta.get("etag")
+    # Weak ETags cannot be used with If-Range
+    validator = etag if etag and not etag.startswith('W/') else meta.get("last_modified")
+    if not validator or offset <= 0:
+        return {}
+    return {'Range': f"bytes={offset}-", 'If-Range': validator}
@@ -2,11 +2,102 @@ import re
 import csv
 import os
 import sys
+import time
+from functools import lru_cache
 
-# Helper function to generate player abbreviation
-def get_abbreviation(full_name):
-    parts = full_name.strip().split()
-    return f"{parts[0][0]}. {parts[-1]}" if parts else ""
+from metrics import get_metrics
+
+# Bump whenever a change to the parser changes the rows it produces, so
+# cached rows from older versions are not reused. "2": the pipeline parses the
+# extracted text without preprocess_text, which had left every draw empty
+PARSER_VERSION = "2"
+
+# Compact records used while parsing; they only become CSV rows at the write
+# boundary (Match.to_row), so a draw is held as shared Player references and
+# a few short tuples rather than 32-element lists per match.
+class Player:
+    __slots__ = ("num", "name", "seeding", "country", "wild", "name_key")
+    
+    def __init__(self, num, name, seeding="", country="", wild=""):
+        self.num = num
+        self.name = name
+        self.seeding = seeding
+        self.country = country
+        self.wild = wild
+        self.name_key = None
+    
+    def __repr__(self):
+        return f"Player({self.num!r}, {self.name!r})"
+
+class SetScore:
+    __slots__ = ("winner", "loser")
+    
+    # A retired marker is stored as SetScore("retired") with no loser games
+    def __init__(self, winner, loser=""):
+        self.winner = winner
+        self.loser = loser
+    
+    def __eq__(self, other):
+        return isinstance(other, SetScore) and (self.winner, self.loser) == (other.winner, other.loser)
+    
+    def __repr__(self):
+        return f"SetScore({self.winner!r}, {self.loser!r})"
+
+# Set scores are immutable and drawn from a small vocabulary ("6"/"4", "7"/"6",
+# ...), so every match shares one SetScore per distinct score
+_SET_SCORES = {}
+
+def set_score(winner, loser=""):
+    score = _SET_SCORES.get((winner, loser))
+    if score is None:
+        score = _SET_SCORES[(winner, loser)] = SetScore(winner, loser)
+    return score
+
+class RoundResult:
+    __slots__ = ("winner_abbr", "sets")
+    
+    def __init__(self, winner_abbr, sets):
+        self.winner_abbr = winner_abbr
+        self.sets = sets
+
+class Match:
+    __slots__ = ("match_id", "round_label", "winner", "loser", "sets")
+    
+    def __init__(self, match_id, round_label, winner, loser, sets):
+        self.match_id = match_id
+        self.round_label = round_label
+        self.winner = winner
+        self.loser = loser
+        self.sets = sets
+    
+    def to_row(self):
+        """Build the CSV row (see CSV_HEADER) for this match."""
+        sets = self.sets
+        # Extract set scores
+        w_scores = [sets[k].winner if k < len(sets) else "" for k in range(5)]
+        l_scores = [sets[k].loser if k < len(sets) else "" for k in range(5)]
+        
+        # Calculate set participation (1 if played, 0 if not)
+        w_set_participation = [1 if w_scores[k] and w_scores[k] != "retired" else 0 for k in range(5)]
+        l_set_participation = [1 if l_scores[k] else 0 for k in range(5)]
+        
+        winner, loser = self.winner, self.loser
+        return [
+            self.match_id, self.round_label, winner.name, winner.seeding, winner.wild, winner.country,
+            *w_scores, *w_set_participation, sum(w_set_participation),
+            loser.name, loser.seeding, loser.wild, loser.country,
+            *l_scores, *l_set_participation, sum(l_set_participation)
+        ]
+
+# Convert matches to CSV rows; rows that are already lists (e.g. read back
+# from a cache) pass through unchanged
+def as_rows(matches):
+    return list(iter_rows(matches))
+
+# Lazily convert matches to CSV rows, one at a time
+def iter_rows(matches):
+    for m in matches:
+        yield m.to_row() if isinstance(m, Match) else m
 
 # Helper function to clean strings for comparison
 def clean_string(s):
@@ -46,10 +137,14 @@ def extract_year_and_gender(text):
 def create_match_pairs(player_list):
     return [(player_list[i], player_list[i + 1]) for i in range(0, len(player_list) - 1, 2)]
 
-# Updated match_player function to handle names correctly with fallback to last name only
-def match_player(winner_abbr, player, fallback_to_last_name=True):
+_SEED_PATTERN = re.compile(r'\s*\[\d+\]')
+
+# Normalise a winner abbreviation such as "K. Kanepi [1]" to (LAST NAME, initials).
+# Abbreviations repeat across rounds and runs, so the result is cached.
+@lru_cache(maxsize=8192)
+def abbreviation_key(winner_abbr):
     # Remove seeding from abbreviation (e.g., [1])
-    winner_abbr = re.sub(r'\s*\[\d+\]', '', winner_abbr).strip()
+    winner_abbr = _SEED_PATTERN.sub('', winner_abbr).strip()
     parts = winner_abbr.split()
     # Split into initials and last name
     if len(parts) >= 2:
@@ -68,8 +163,11 @@ def match_player(winner_abbr, player, fallback_to_last_name=True):
         else:
             winner_initials.append(part[0])
     
-    # Process player's full name
-    player_parts = player["name"].split()
+    return clean_string(last_name), tuple(winner_initials)
+
+# Normalise a player's full name to (LAST NAME, initials)
+def name_key(full_name):
+    player_parts = full_name.split()
     if len(player_parts) >= 2:
         player_last_name = player_parts[-1]  # Last word as the last name
         player_first_names = player_parts[:-1]  # All preceding words as first names
@@ -85,30 +183,60 @@ def match_player(winner_abbr, player, fallback_to_last_name=True):
         else:
             player_initials.append(fn[0].upper())
     
-    # Match last name and initials
-    last_name_match = clean_string(last_name) == clean_string(player_last_name)
-    initials_match = all(i in player_initials for i in winner_initials)
-    
-    # Return True if last names match and initials are a subset or single initial matches
-    if last_name_match:
-        if initials_match or (len(winner_initials) == 1 and len(player_initials) >= 1):
-            return True
-        
-        # Fallback to last name only if requested
-        if fallback_to_last_name:
-            return True
-    
-    return False
+    return clean_string(player_last_name), tuple(player_initials)
+
+# Compare normalised winner and player keys
+def keys_match(winner_key, player_key, fallback_to_last_name=True):
+    last_name, winner_initials = winner_key
+    player_last_name, player_initials = player_key
+    if last_name != player_last_name:
+        return False
+    
+    # Fallback to last name only if requested
+    if fallback_to_last_name:
+        return True
+    
+    # Otherwise the initials must be a subset or a single initial must be given
+    return (all(i in player_initials for i in winner_initials)
+            or (len(winner_initials) == 1 and len(player_initials) >= 1))
+
+# Index players by normalised last name; built once from the First Round and
+# reused for every later round, since winners are the same player records
+def build_name_index(players):
+    name_index = {}
+    for player in players:
+        player.name_key = name_key(player.name)
+        name_index.setdefault(player.name_key[0], set()).add(player)
+    return name_index
+
+# Resolve a winner key to one of the two players of a match (p1 first), or None.
+# Only the players indexed under the winner's last name are compared.
+def resolve_winner(winner_key, p1, p2, name_index, fallback_to_last_name=True):
+    candidates = name_index.get(winner_key[0])
+    if not candidates:
+        return None
+    for player in (p1, p2):
+        if player in candidates and keys_match(winner_key, player.name_key, fallback_to_last_name):
+            return player
+    return None
+
+# Split a section into its stripped, non-empty lines
+def section_lines(section_text):
+    return [stripped for line in section_text.splitlines() if (stripped := line.strip())]
 
 # Parse round results
 def parse_round_results(section_text):
-    print(f"Parsing round results with text length: {len(section_text)}")
-    lines = [line.strip() for line in section_text.splitlines() if line.strip()]
-    print(f"Found {len(lines)} non-empty lines")
+    get_metrics().log(f"Parsing round results with text length: {len(section_text)}")
+    return parse_round_lines(section_lines(section_text))
+
+# Parse round results from a section that has already been split into lines
+def parse_round_lines(lines):
+    metrics = get_metrics()
+    metrics.log(f"Found {len(lines)} non-empty lines")
     
     # Log a sample of lines to help with debugging
     if lines:
-        print(f"Sample lines: {lines[:3]}")
+        metrics.log(f"Sample lines: {lines[:3]}")
     
     # Check for various formats the results might be in
     has_score_lines = any(line.startswith('.') for line in lines)
@@ -126,16 +254,16 @@ def parse_round_results(section_text):
                 sets = []
                 if re.search(r'\d+/\d+', score_line):
                     for score in re.finditer(r'(\d+)/(\d+)', score_line):
-                        sets.append((score.group(1), score.group(2)))
+                        sets.append(set_score(score.group(1), score.group(2)))
                 elif "retired" in score_line.lower():
                     for score in re.finditer(r'(\d+)/(\d+)', score_line):
-                        sets.append((score.group(1), score.group(2)))
-                    sets.append(("retired",))
+                        sets.append(set_score(score.group(1), score.group(2)))
+                    sets.append(set_score("retired"))
                 elif "wo." in score_line.lower() or "def" in score_line.lower():
                     sets = []
                 else:
                     sets = []
-                results.append({"winner_abbr": winner_abbr, "sets": sets})
+                results.append(RoundResult(winner_abbr, tuple(sets)))
                 i += 2
             else:
                 i += 1
@@ -150,17 +278,17 @@ def parse_round_results(section_text):
                 if "retired" in score_str.lower():
                     # Handle retired matches
                     for score in re.finditer(r'(\d+)/(\d+)', score_str):
-                        sets.append((score.group(1), score.group(2)))
-                    sets.append(("retired",))
+                        sets.append(set_score(score.group(1), score.group(2)))
+                    sets.append(set_score("retired"))
                 elif any(x in score_str.lower() for x in ["wo.", "def"]):
                     # Handle walkovers and defaults
                     sets = []
                 else:
                     # Handle normal scores
                     for score in re.finditer(r'(\d+)/(\d+)', score_str):
-                        sets.append((score.group(1), score.group(2)))
+                        sets.append(set_score(score.group(1), score.group(2)))
                 
-                results.append({"winner_abbr": winner_abbr, "sets": sets})
+                results.append(RoundResult(winner_abbr, tuple(sets)))
     else:
         # Try to find any format with scores
         score_pattern = re.compile(r'([A-Z][\.\w\s\[\]\-]+)\s+(\d+/\d+\s+\d+/\d+(?:\s+\d+/\d+)?)')
@@ -170,17 +298,20 @@ def parse_round_results(section_text):
                 score_str = m.group(2).strip()
                 sets = []
                 for score in re.finditer(r'(\d+)/(\d+)', score_str):
-                    sets.append((score.group(1), score.group(2)))
+                    sets.append(set_score(score.group(1), score.group(2)))
                 if sets:
-                    results.append({"winner_abbr": winner_abbr, "sets": sets})
+                    results.append(RoundResult(winner_abbr, tuple(sets)))
     
-    print(f"Parsed {len(results)} results")
+    metrics.log(f"Parsed {len(results)} results")
     return results
 
 # Extract winners from the next round
 def extract_winners_from_next_round(section_text):
+    return extract_winners_from_lines(section_lines(section_text))
+
+# Extract winners from a next-round section that has already been split into lines
+def extract_winners_from_lines(lines):
     winners = []
-    lines = [line.strip() for line in section_text.splitlines() if line.strip()]
     
     # Try to find lines that look like winner names (start with letters, may contain [seed])
     for line in lines:
@@ -191,75 +322,129 @@ def extract_winners_from_next_round(section_text):
     
     return winners
 
+# Round headers in the order they appear in a draw
+ROUND_HEADERS = ['First Round', 'Second Round', 'Third Round', 'Qualifiers']
+_HEADER_PATTERN = '|'.join(ROUND_HEADERS)
+
+# One alternation covering every normalisation preprocess_text applies after
+# whitespace has been collapsed, so the text is scanned once. The
+# alternatives start with different characters (digit, header letter, '[',
+# 'l'/'O'), so they never compete for the same position, and the leading
+# lookahead lets the scan skip every other character (mostly the dot
+# leaders) without trying each alternative.
+_PREPROCESS_PATTERN = re.compile(
+    r'(?=[\d\[FSTQlO])(?:'
+    rf'(?P<num>\d+) ?\. ?(?P<num_header>{_HEADER_PATTERN})?'
+    rf'|(?P<header>{_HEADER_PATTERN})'
+    r'|\[ ?(?P<seed>\d+) ?\]'
+    r'|(?P<ocr>[lO])/'
+    r')'
+)
+_OCR_FIXES = {'l': '1/', 'O': '0/'}
+
+def _normalise_token(m):
+    num = m.group('num')
+    if num is not None:
+        # Player numbers become "N. "; a header straight after the number keeps
+        # its trailing line break only
+        num_header = m.group('num_header')
+        return f"{num}. {num_header}\n" if num_header else f"{num}. "
+    header = m.group('header')
+    if header is not None:
+        # Ensure round headers are on their own line
+        return f"\n{header}\n"
+    seed = m.group('seed')
+    if seed is not None:
+        # Clean up player seeds
+        return f"[{seed}]"
+    # Fix common OCR errors
+    return _OCR_FIXES[m.group('ocr')]
+
 # Preprocess text to improve consistency
 def preprocess_text(text):
     """Clean and normalize the text for better parsing."""
-    # Replace various whitespace characters with a single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Ensure round headers are on their own line
-    for header in ['First Round', 'Second Round', 'Third Round', 'Qualifiers']:
-        text = re.sub(f'({header})', r'\n\1\n', text)
-    
-    # Clean up player numbers and ensure they're properly formatted
-    text = re.sub(r'(\d+)\s*\.\s*', r'\1. ', text)
-    
-    # Clean up player seeds
-    text = re.sub(r'\[\s*(\d+)\s*\]', r'[\1]', text)
-    
-    # Fix common OCR errors
-    text = text.replace('l/', '1/').replace('O/', '0/')
+    # Replace various whitespace characters with a single space (str.split()
+    # splits on the same characters as \s, but runs without the regex engine)
+    collapsed = ' '.join(text.split())
+    if collapsed:
+        if text[0].isspace():
+            collapsed = ' ' + collapsed
+        if text[-1].isspace():
+            collapsed += ' '
+    elif text:
+        collapsed = ' '
+    
+    # Headers, player numbers, seeds and OCR fixes in one pass
+    return _PREPROCESS_PATTERN.sub(_normalise_token, collapsed)
+
+_ROUND_SPLIT_PATTERN = re.compile(f'({_HEADER_PATTERN})')
+
+# Index the rounds of a draw in one scan for the round headers
+def index_rounds(text):
+    """
+    Find every round header once and split each round's text into lines once.
+    
+    Returns (order, round_lines): the round names in the order they appear
+    (repeats included) and, for each name, the stripped non-empty lines of its
+    last occurrence. Every consumer works from these shared line lists instead
+    of re-splitting the section text.
+    """
+    headers = list(_ROUND_SPLIT_PATTERN.finditer(text))
+    spans = {}
+    order = []
+    for k, header in enumerate(headers):
+        end = headers[k + 1].start() if k + 1 < len(headers) else len(text)
+        spans[header.group(1)] = (header.end(), end)
+        order.append(header.group(1))
     
-    return text
+    round_lines = {name: section_lines(text[start:end]) for name, (start, end) in spans.items()}
+    return order, round_lines
+
+# Regex for a First Round player line, e.g. "(WC) 12. Luke Milligan [3]....(GBR)"
+FIRST_ROUND_PATTERN = re.compile(
+    r'^(?:\((?P<prefix>WC|Alt)\))?\s*(?P<num>\d+)\.\s*(?P<name>[^\[\.\n]+)(?:\s*\[(?P<seeding>\d+)\])?.*?\(?\s*(?P<country>[A-Z]{3})\)?',
+    re.MULTILINE
+)
 
-# Main processing function
-def process_tournament_text(input_text):
-    # Preprocess the text
-    input_text = preprocess_text(input_text)
+# Main processing function: parse a draw and return its matches
+def process_tournament_text(input_text, preprocess=True):
+    return list(iter_tournament_matches(input_text, preprocess))
+
+# Streaming variant: yields each Match as soon as it is resolved, round by
+# round, so a writer can consume the draw without it being built up first
+def iter_tournament_matches(input_text, preprocess=True):
+    # Preprocess the text; text that is already one entry per line (as
+    # extract_text_from_pdf produces) can skip this
+    metrics = get_metrics()
+    if preprocess:
+        with metrics.timer("preprocess"):
+            input_text = preprocess_text(input_text)
     
     # Extract year and gender
     year, gender = extract_year_and_gender(input_text)
     print(f"Processing tournament data: Year {year}, Gender {gender}")
     
     # Split the text into rounds
-    round_splits = re.split(r'(First Round|Second Round|Third Round|Qualifiers)', input_text)
-    
-    round_data = {}
-    order = []
-    
-    for i in range(1, len(round_splits), 2):
-        if i < len(round_splits):
-            round_name = round_splits[i].strip()
-            round_content = round_splits[i + 1].strip() if i + 1 < len(round_splits) else ""
-            round_data[round_name] = round_content
-            order.append(round_name)
-    
-    # Fixed regex to use 'name' group consistently
-    first_round_pattern = re.compile(
-        r'^(?:\((?P<prefix>WC|Alt)\))?\s*(?P<num>\d+)\.\s*(?P<name>[^\[\.\n]+)(?:\s*\[(?P<seeding>\d+)\])?.*?\(?\s*(?P<country>[A-Z]{3})\)?',
-        re.MULTILINE
-    )
+    order, round_lines = index_rounds(input_text)
     
     # Parse First Round players
     players = []
-    if "First Round" in round_data:
-        for line in round_data["First Round"].splitlines():
-            if line.strip() and (match := first_round_pattern.search(line.strip())):
-                name = match.group("name").strip() if match.group("name") else ""
-                num = match.group("num") if match.group("num") else ""
-                prefix = match.group("prefix") if match.group("prefix") else ""
-                
-                players.append({
-                    "num": int(num) if num else 0,
-                    "name": name,
-                    "seeding": match.group("seeding") or "",
-                    "country": match.group("country").strip() if match.group("country") else "",
-                    "wild": "1" if prefix == "WC" else "",
-                    "abbrev": get_abbreviation(name)
-                })
+    for line in round_lines.get("First Round", []):
+        if match := FIRST_ROUND_PATTERN.search(line):
+            name = match.group("name").strip() if match.group("name") else ""
+            num = match.group("num") if match.group("num") else ""
+            prefix = match.group("prefix") if match.group("prefix") else ""
+            
+            players.append(Player(
+                num=int(num) if num else 0,
+                name=name,
+                seeding=match.group("seeding") or "",
+                country=match.group("country").strip() if match.group("country") else "",
+                wild="1" if prefix == "WC" else ""
+            ))
     
     # Sort players by number
-    players.sort(key=lambda x: x["num"])
+    players.sort(key=lambda x: x.num)
     print(f"Number of players parsed: {len(players)}")
     
     # Process matches
@@ -267,95 +452,111 @@ def process_tournament_text(input_text):
     round_mapping = {"Second Round": "R128", "Third Round": "R64", "Qualifiers": "R32"}
     round_num_mapping = {"Second Round": "128", "Third Round": "64", "Qualifiers": "32"}
     
-    match_rows = []
+    name_index = build_name_index(players)
     current_matches = create_match_pairs(players)
     
-    for i, section in enumerate(match_result_sections):
-        round_label = round_mapping.get(section, f"R?{section}")
-        round_num = round_num_mapping.get(section, "?")
-        section_text = round_data.get(section, "")
+    try:
+        for i, section in enumerate(match_result_sections):
+            round_label = round_mapping.get(section, f"R?{section}")
+            round_num = round_num_mapping.get(section, "?")
+            lines = round_lines.get(section, [])
         
-        results = parse_round_results(section_text)
-        next_winners = extract_winners_from_next_round(round_data.get(match_result_sections[i + 1], "")) if i + 1 < len(
-            match_result_sections) else []
+            with metrics.timer("parse_round_results", round=round_label):
+                results = parse_round_lines(lines)
+            next_winners = extract_winners_from_lines(round_lines.get(match_result_sections[i + 1], [])) if i + 1 < len(
+                match_result_sections) else []
         
-        expected_matches = len(current_matches)
-        if len(results) != expected_matches:
-            print(
-                f"Warning: Number of results ({len(results)}) in {section} does not match expected matches ({expected_matches})")
+            expected_matches = len(current_matches)
+            if len(results) != expected_matches:
+                print(
+                    f"Warning: Number of results ({len(results)}) in {section} does not match expected matches ({expected_matches})")
         
-        winners = []
-        match_num = 1
+            winners = []
+            match_num = 1
+            # Time spent resolving this round's winners, excluding the time
+            # the consumer of the yielded matches takes
+            matching_seconds = 0.0
         
-        for j, (p1, p2) in enumerate(current_matches[:len(results)]):
-            if j >= len(results):
-                print(f"Warning: Not enough results for match {j + 1}")
-                continue
+            for j, (p1, p2) in enumerate(current_matches[:len(results)]):
+                start = time.perf_counter()
+                if j >= len(results):
+                    print(f"Warning: Not enough results for match {j + 1}")
+                    continue
                 
-            result = results[j]
-            winner_abbr = result["winner_abbr"]
-            sets = result["sets"]
+                result = results[j]
+                winner_abbr = result.winner_abbr
+                sets = result.sets
             
-            # First try with strict matching (no fallback)
-            if match_player(winner_abbr, p1, fallback_to_last_name=False):
-                winner, loser = p1, p2
-                print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']}")
-            elif match_player(winner_abbr, p2, fallback_to_last_name=False):
-                winner, loser = p2, p1
-                print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']}")
-            else:
-                # If strict matching failed, try with fallback to last name only
-                if match_player(winner_abbr, p1, fallback_to_last_name=True):
-                    winner, loser = p1, p2
-                    print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (matched by last name)")
-                elif match_player(winner_abbr, p2, fallback_to_last_name=True):
-                    winner, loser = p2, p1
-                    print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (matched by last name)")
+                winner_key = abbreviation_key(winner_abbr)
+            
+                # First try with strict matching (no fallback)
+                winner = resolve_winner(winner_key, p1, p2, name_index, fallback_to_last_name=False)
+                if winner is not None:
+                    loser = p2 if winner is p1 else p1
+                    metrics.increment("matches", resolution="strict")
+                    metrics.log(f"{section} Match {j + 1}: {winner.name} beat {loser.name}")
                 else:
-                    # If even fallback matching fails, try next round information
-                    print(f"{section} Match {j + 1}: Cannot match '{winner_abbr}' to {p1['name']} or {p2['name']}")
-                    if j < len(next_winners) and next_winners[j]:
-                        if match_player(next_winners[j], p1):
-                            winner, loser = p1, p2
-                            print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (via next round)")
-                        elif match_player(next_winners[j], p2):
-                            winner, loser = p2, p1
-                            print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (via next round)")
+                    # If strict matching failed, try with fallback to last name only
+                    winner = resolve_winner(winner_key, p1, p2, name_index, fallback_to_last_name=True)
+                    if winner is not None:
+                        loser = p2 if winner is p1 else p1
+                        metrics.increment("matches", resolution="last_name")
+                        metrics.log(f"{section} Match {j + 1}: {winner.name} beat {loser.name} (matched by last name)")
+                    else:
+                        # If even fallback matching fails, try next round information
+                        metrics.log(f"{section} Match {j + 1}: Cannot match '{winner_abbr}' to {p1.name} or {p2.name}")
+                        if j < len(next_winners) and next_winners[j]:
+                            winner = resolve_winner(abbreviation_key(next_winners[j]), p1, p2, name_index)
+                            if winner is not None:
+                                loser = p2 if winner is p1 else p1
+                                metrics.increment("matches", resolution="next_round")
+                                metrics.log(f"{section} Match {j + 1}: {winner.name} beat {loser.name} (via next round)")
+                            else:
+                                winner, loser = p1, p2
+                                metrics.increment("matches", resolution="fallback_p1")
+                                print(f"{section} Match {j + 1}: Fallback to {winner.name} (unmatched '{next_winners[j]}')")
                         else:
                             winner, loser = p1, p2
-                            print(f"{section} Match {j + 1}: Fallback to {winner['name']} (unmatched '{next_winners[j]}')")
-                    else:
-                        winner, loser = p1, p2
-                        print(f"{section} Match {j + 1}: Fallback to {winner['name']} (no next round info)")
-            
-            # Extract set scores
-            w_scores = [sets[k][0] if k < len(sets) else "" for k in range(5)]
-            l_scores = [sets[k][1] if k < len(sets) and len(sets[k]) > 1 else "" for k in range(5)]
-            
-            # Calculate set participation (1 if played, 0 if not)
-            w_set_participation = [1 if w_scores[k] and w_scores[k] != "retired" else 0 for k in range(5)]
-            l_set_participation = [1 if l_scores[k] else 0 for k in range(5)]
+                            metrics.increment("matches", resolution="fallback_p1")
+                            print(f"{section} Match {j + 1}: Fallback to {winner.name} (no next round info)")
             
-            # Calculate total sets played
-            w_set = sum(w_set_participation)
-            l_set = sum(l_set_participation)
-            
-            match_id_str = f"{year}_{gender}_{round_num}_{match_num}"
-            match_rows.append([
-                match_id_str, round_label, winner["name"], winner["seeding"], winner["wild"], winner["country"],
-                *w_scores, *w_set_participation, w_set,
-                loser["name"], loser["seeding"], loser["wild"], loser["country"],
-                *l_scores, *l_set_participation, l_set
-            ])
-            match_num += 1
-            winners.append(winner)
+                match_id_str = f"{year}_{gender}_{round_num}_{match_num}"
+                matching_seconds += time.perf_counter() - start
+                yield Match(match_id_str, round_label, winner, loser, sets)
+                match_num += 1
+                winners.append(winner)
         
-        current_matches = create_match_pairs(winners)
-    
-    return match_rows
+            metrics.observe("matching", matching_seconds, round=round_label)
+            current_matches = create_match_pairs(winners)
+    finally:
+        # The name keys are only needed while resolving winners; the matches keep
+        # the players alive, so drop them
+        for player in players:
+            player.name_key = None
+
+CSV_HEADER = ["Match Id", "Round", "W_name", "W_seed", "W_Wc", "W_country",
+              "W_set1", "W_set2", "W_set3", "W_set4", "W_set5",
+              "W_set1_p", "W_set2_p", "W_set3_p", "W_set4_p", "W_set5_p", "W_set",
+              "L_name", "L_seed", "L_Wc", "L_country",
+              "L_set1", "L_set2", "L_set3", "L_set4", "L_set5",
+              "L_set1_p", "L_set2_p", "L_set3_p", "L_set4_p", "L_set5_p", "L_set"]
 
 # Write data to CSV
-def write_to_csv(match_rows, output_file="output.csv"):
+def write_to_csv(match_rows, output_file="output.csv", incremental=True):
+    # Matches become CSV rows only here, at the write boundary; both writers
+    # consume the rows lazily, so a generator of matches is streamed through
+    match_rows = iter_rows(match_rows)
+    
+    # By default rows go through the Match Id index, so re-processing a year
+    # skips rows already written and replaces a tournament whose rows changed
+    if incremental:
+        # Imported here so the CLI does not pay for it before it writes
+        from csv_index import IncrementalCSVWriter
+        stats = IncrementalCSVWriter(output_file, CSV_HEADER).write(match_rows)
+        print(f"Data has been written to {output_file} "
+              f"({stats['written']} new, {stats['replaced']} replaced, {stats['skipped']} unchanged)")
+        return
+    
     # Check if file exists to determine if we need to write headers
     file_exists = os.path.exists(output_file) and os.path.getsize(output_file) > 0
     
@@ -363,29 +564,69 @@ def write_to_csv(match_rows, output_file="output.csv"):
     with open(output_file, mode, newline="", encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
         if not file_exists:
-            writer.writerow(["Match Id", "Round", "W_name", "W_seed", "W_Wc", "W_country",
-                             "W_set1", "W_set2", "W_set3", "W_set4", "W_set5",
-                             "W_set1_p", "W_set2_p", "W_set3_p", "W_set4_p", "W_set5_p", "W_set",
-                             "L_name", "L_seed", "L_Wc", "L_country",
-                             "L_set1", "L_set2", "L_set3", "L_set4", "L_set5",
-                             "L_set1_p", "L_set2_p", "L_set3_p", "L_set4_p", "L_set5_p", "L_set"])
+            writer.writerow(CSV_HEADER)
         writer.writerows(match_rows)
     
     print(f"Data has been written to {output_file}")
 
-# Main entry point
-if __name__ == "__main__":
-    # Check if we have input from stdin
-    if not sys.stdin.isatty():
-        input_text = sys.stdin.read()
+# Path of scraper/final.py, which embeds the 2010 Ladies' qualifying draw
+SAMPLE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper', 'final.py')
+
+# Read the draw embedded in scraper/final.py without executing that script
+def load_embedded_sample():
+    import ast
+    with open(SAMPLE_SCRIPT, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'input_text' for t in node.targets):
+            return ast.literal_eval(node.value)
+    return ""
+
+# Command-line entry point, shared with scraper/final.py: parse the draw piped
+# to stdin (or default_text, or the embedded sample, when stdin is empty)
+# and write its matches. Options: --output PATH (default output.csv),
+# --parquet DIR and --sqlite PATH to also write a Parquet dataset and a SQLite
+# match store, --no-preprocess for text that is already one entry per line,
+# and --verbose to log every match.
+def main(argv=None, default_text=None):
+    # Imported here to keep argparse out of the parser's start-up
+    import argparse
+    parser = argparse.ArgumentParser(description="Parse a draw read from stdin and update the match CSV")
+    parser.add_argument("--output", default="output.csv", help="CSV file to update")
+    parser.add_argument("--parquet", metavar="DIR", help="also write the rows to this Parquet dataset")
+    parser.add_argument("--sqlite", metavar="PATH", help="also upsert the rows into this SQLite match store")
+    parser.add_argument("--no-preprocess", action="store_true",
+                        help="the input is already one entry per line, as extract_text_from_pdf writes it")
+    parser.add_argument("--verbose", action="store_true", help="log the outcome of every match")
+    args = parser.parse_args(argv)
+    
+    preprocess = not args.no_preprocess
+    input_text = "" if sys.stdin.isatty() else sys.stdin.read()
+    if input_text.strip():
         print(f"Received {len(input_text)} characters from stdin")
     else:
-        # Use the sample data from the original script for testing
         print("No input from stdin, using sample data")
-        from test_final import input_text
-    
-    # Process the input text
-    match_rows = process_tournament_text(input_text)
-    
-    # Write to CSV
-    write_to_csv(match_rows)
\ No newline at end of file
+        input_text = default_text if default_text is not None else load_embedded_sample()
+        # The sample is already one entry per line
+        preprocess = False
+    
+    get_metrics().verbose = args.verbose
+    
+    # Process the input text and stream the matches into the CSV
+    matches = iter_tournament_matches(input_text, preprocess)
+    if args.parquet or args.sqlite:
+        # The Parquet dataset and the SQLite store are written after the CSV.
+        # Rows, not Match records, are kept: when this file runs as a script,
+        # columnar and store import a second copy of it with its own Match
+        matches = as_rows(matches)
+    write_to_csv(matches, args.output)
+    if args.parquet:
+        from columnar import write_to_parquet
+        write_to_parquet(matches, args.parquet)
+    if args.sqlite:
+        from store import write_to_sqlite
+        write_to_sqlite(matches, args.sqlite)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import json
+import re
+from collections import namedtuple
+from urllib.parse import urlparse, urlunparse
+
+DEFAULT_URL_TEMPLATE = "https://assets.wimbledon.com/archive/draws/pdfs/draws/{year}_{event}.pdf"
+
+# Events drawn for one gender only. Any other event (e.g. "QS") is drawn once
+# per gender, with a "_M"/"_W" suffix: "QS_M", "QS_W".
+SINGLE_GENDER_EVENTS = {"MS": "M", "LS": "W", "MD": "M", "LD": "W"}
+
+# Events final.py can parse; draws of other events are downloaded only
+PARSED_EVENTS = {"QS"}
+
+# One draw to fetch: event is the full code used in file names, e.g. "QS_M"
+DrawJob = namedtuple("DrawJob", ["year", "event", "gender", "url", "filename", "priority"])
+
+
+def job_key(job):
+    """Return the name a job is known by in journals, e.g. "2002_QS_M"."""
+    return f"{job.year}_{job.event}"
+
+
+def is_parsed(job):
+    """Return True if final.py can parse the job's draw."""
+    return job.event.split('_')[0] in PARSED_EVENTS
+
+
+def url_template_from(url):
+    """
+    Turn the URL of one draw into a template for all of them.
+
+    Args:
+        url (str): URL of a draw PDF, e.g. .../2002_QS_M.pdf
+
+    Returns:
+        str: The URL with {year} and {event} placeholders, e.g. .../{year}_{event}.pdf
+
+    Raises:
+        ValueError: If the URL does not end in a {year}_{event}.pdf file name
+    """
+    parsed_url = urlparse(url)
+    path, count = re.subn(r'/\d{4}_[A-Z]+(?:_[MW])?\.pdf$', '/{year}_{event}.pdf', parsed_url.path)
+    if not count:
+        raise ValueError(f"Cannot make a URL template from {url}: expected a file name like 2002_QS_M.pdf")
+    return urlunparse(parsed_url._replace(path=path))
+
+
+def parse_years(years):
+    """
+    Expand a years value from a job spec.
+
+    Args:
+        years (int, str or list): 2004, "2002-2010", "2002,2004" or a list of these
+
+    Returns:
+        list: The years, in the order given
+    """
+    if isinstance(years, int):
+        return [years]
+    if isinstance(years, (list, tuple)):
+        return [year for value in years for year in parse_years(value)]
+    expanded = []
+    for part in str(years).split(','):
+        part = part.strip()
+        if m := re.fullmatch(r'(\d{4})\s*-\s*(\d{4})', part):
+            expanded.extend(range(int(m.group(1)), int(m.group(2)) + 1))
+        elif part:
+            expanded.append(int(part))
+    return expanded
+
+
+def event_codes(event, genders):
+    """
+    Return (code, gender) for each draw of an event, e.g. "QS" gives
+    ("QS_M", "M") and ("QS_W", "W"); "MS" gives ("MS", "M").
+    """
+    if m := re.fullmatch(r'([A-Z]+)_([MW])', event):
+        return [(event, m.group(2))] if m.group(2) in genders else []
+    if event in SINGLE_GENDER_EVENTS:
+        gender = SINGLE_GENDER_EVENTS[event]
+        return [(event, gender)] if gender in genders else []
+    return [(f"{event}_{gender}", gender) for gender in genders]
+
+
+def expand_job_spec(spec):
+    """
+    Expand a declarative job spec into draw jobs.
+
+    A spec is a dict, or a list of dicts, with the keys:
+
+        years: 2004, "2002-2010", "2002,2004" or a list of these
+        genders: genders to fetch (default ["M", "W"])
+        events: event codes such as "QS", "QS_M", "MS" or "LS" (default ["QS"])
+        priority: jobs with a higher priority run first (default 0)
+        url_template: URL with {year} and {event} placeholders
+
+    Args:
+        spec (dict or list): The job spec
+
+    Returns:
+        list: DrawJob tuples, de-duplicated and in the order they should run
+    """
+    blocks = spec if isinstance(spec, list) else spec.get("jobs", [spec])
+    jobs = []
+    for block in blocks:
+        url_template = block.get("url_template", DEFAULT_URL_TEMPLATE)
+        genders = [gender.upper() for gender in block.get("genders", ["M", "W"])]
+        priority = int(block.get("priority", 0))
+        for year in parse_years(block["years"]):
+            for event in block.get("events", ["QS"]):
+                for code, gender in event_codes(event.upper(), genders):
+                    jobs.append(DrawJob(year, code, gender, url_template.format(year=year, event=code),
+                                        f"{year}_{code}.pdf", priority))
+    return dedupe_jobs(jobs)
+
+
+def dedupe_jobs(jobs):
+    """
+    Keep one job per draw, the one with the highest priority, and order them by
+    priority, then year, then event.
+
+    Args:
+        jobs (list): DrawJob tuples
+
+    Returns:
+        list: The de-duplicated jobs in run order
+    """
+    best = {}
+    for job in jobs:
+        key = job_key(job)
+        if key not in best or job.priority > best[key].priority:
+            best[key] = job
+    return sorted(best.values(), key=lambda job: (-job.priority, job.year, job.event))
+
+
+def load_job_spec(path):
+    """Read a job spec from a JSON file and expand it into draw jobs."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return expand_job_spec(json.load(f))
+
@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+import time
+
+# Stages each PDF goes through, in order
+STAGES = ("download", "extract", "parse", "write")
+
+
+class Journal:
+    """
+    Append-only journal of the state of each PDF in a batch run.
+
+    Every stage a PDF goes through (download, extract, parse, write) appends a
+    JSON line recording whether it finished or failed, plus details such as the
+    PDF's SHA-256 or the number of matches. The latest line for a stage wins.
+    A restarted run uses it to skip the stages that already finished and re-run
+    the ones that failed or never ran. A line cut short by a crash is dropped
+    when the journal is loaded.
+
+    A stage finished under an older extractor or parser version does not count
+    as finished, so changing either re-runs the stages it affects.
+    """
+
+    def __init__(self, path="pipeline.journal.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.states = {}
+        if os.path.exists(path):
+            with open(path, 'r+b') as f:
+                data = f.read()
+                # Drop a last line cut short by a crash, so the next record
+                # starts on a line of its own
+                end = data.rfind(b'\n') + 1
+                if end < len(data):
+                    f.truncate(end)
+            for line in data[:end].splitlines():
+                try:
+                    entry = json.loads(line)
+                    self.states.setdefault(entry["pdf"], {})[entry["stage"]] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def state(self, key, stage):
+        """Return the latest entry for a PDF's stage, or None if it never ran."""
+        with self._lock:
+            return self.states.get(key, {}).get(stage)
+
+    def is_done(self, key, stage="write", version=None):
+        """
+        Return True if the stage finished for the PDF (by default, whether the
+        PDF was written), under the given version if one is given.
+        """
+        entry = self.state(key, stage)
+        if entry is None or entry["status"] != "done":
+            return False
+        return version is None or entry.get("version") == version
+
+    def record(self, key, stage, status, **info):
+        """
+        Append the outcome of a stage for a PDF.
+
+        Args:
+            key (str): Name of the PDF, e.g. "2002_QS_M"
+            stage (str): One of STAGES
+            status (str): "done" or "failed"
+            **info: Extra details to store, e.g. sha256, matches, version, error
+        """
+        entry = dict(info, pdf=key, stage=stage, status=status, time=time.time())
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.states.setdefault(key, {})[stage] = entry
@@ -0,0 +1,172 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Prefix of every exported Prometheus metric
+PROMETHEUS_PREFIX = "tennis"
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _prometheus_labels(key):
+    if not key:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage timers and event counters.
+
+    Timers accumulate the count, total and maximum wall time of a stage for
+    each set of labels, e.g. timer("extract", pdf="2002_QS_M.pdf"). Counters
+    count events, e.g. increment("matches", resolution="strict"). A snapshot
+    can be exported as JSON or in the Prometheus text format.
+
+    The parser and the pipeline record into the current registry (see
+    get_metrics()); set_metrics() swaps in another one, such as NullMetrics to
+    turn recording off. Verbose per-match logging is off unless verbose is set.
+    Worker processes of the batch and archive modes record into a registry of
+    their own and send its snapshot back, which the parent merges in.
+    """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+
+    def observe(self, stage, seconds, **labels):
+        """Record one run of a stage that took seconds."""
+        key = (stage, _label_key(labels))
+        with self._lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Time the body of a with statement as one run of stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def increment(self, name, amount=1, **labels):
+        """Add amount to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def merge(self, snapshot):
+        """Add the timers and counters of a snapshot, e.g. one taken in a worker process."""
+        with self._lock:
+            for timer in snapshot["timers"]:
+                key = (timer["stage"], _label_key(timer["labels"]))
+                current = self.timers.get(key)
+                if current is None:
+                    self.timers[key] = [timer["count"], timer["seconds"], timer["max_seconds"]]
+                else:
+                    current[0] += timer["count"]
+                    current[1] += timer["seconds"]
+                    current[2] = max(current[2], timer["max_seconds"])
+            for counter in snapshot["counters"]:
+                key = (counter["name"], _label_key(counter["labels"]))
+                self.counters[key] = self.counters.get(key, 0) + counter["value"]
+
+    def log(self, message):
+        """Print a verbose message, e.g. the outcome of each match."""
+        if self.verbose:
+            print(message)
+
+    def counter(self, name, **labels):
+        """Return the current value of a counter (0 if it was never incremented)."""
+        with self._lock:
+            return self.counters.get((name, _label_key(labels)), 0)
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """
+        Return the current timers and counters as plain data.
+
+        Returns:
+            dict: {"timers": [{"stage", "labels", "count", "seconds", "max_seconds"}],
+                "counters": [{"name", "labels", "value"}]}
+        """
+        with self._lock:
+            timers = [{"stage": stage, "labels": dict(key), "count": count, "seconds": total, "max_seconds": peak}
+                      for (stage, key), (count, total, peak) in sorted(self.timers.items())]
+            counters = [{"name": name, "labels": dict(key), "value": value}
+                        for (name, key), value in sorted(self.counters.items())]
+        return {"timers": timers, "counters": counters}
+
+    def to_json(self):
+        # Imported here to keep json out of the parser's start-up
+        import json
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Return the snapshot in the Prometheus text exposition format."""
+        with self._lock:
+            timers = sorted(self.timers.items())
+            counters = sorted(self.counters.items())
+        family = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        lines = [f"# TYPE {family} summary"]
+        for (stage, key), (count, total, _) in timers:
+            labels = _prometheus_labels(_label_key({"stage": stage, **dict(key)}))
+            lines.append(f"{family}_sum{labels} {total}")
+            lines.append(f"{family}_count{labels} {count}")
+        typed = set()
+        for (name, key), value in counters:
+            family = f"{PROMETHEUS_PREFIX}_{name}_total"
+            if family not in typed:
+                typed.add(family)
+                lines.append(f"# TYPE {family} counter")
+            lines.append(f"{family}{_prometheus_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write a snapshot to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        data = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+
+class NullMetrics(Metrics):
+    """Metrics that records nothing, for runs where even timing is unwanted."""
+
+    def observe(self, stage, seconds, **labels):
+        pass
+
+    def increment(self, name, amount=1, **labels):
+        pass
+
+    def merge(self, snapshot):
+        pass
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the registry the parser and the pipeline record into."""
+    return _metrics
+
+
+def set_metrics(metrics):
+    """Make metrics the registry everything records into; returns the previous one."""
+    global _metrics
+    previous, _metrics = _metrics, metrics
+    return previous
@@ -0,0 +1,144 @@
+import csv
+import sqlite3
+
+from columnar import FLAG_COLUMNS, INT_COLUMNS, _to_int
+from final import CSV_HEADER, iter_rows
+
+
+def column_name(header):
+    """Return the SQL column for a CSV column, e.g. "match_id" for "Match Id"."""
+    return header.lower().replace(' ', '_')
+
+
+def _sql_type(header):
+    return "INTEGER" if header in INT_COLUMNS or header in FLAG_COLUMNS else "TEXT"
+
+
+COLUMNS = [column_name(header) for header in CSV_HEADER] + ["retired", "year", "gender"]
+
+# Columns lookups filter on; each gets its own index
+INDEXED_COLUMNS = ["w_name", "l_name", "w_country", "l_country", "year", "gender", "round"]
+
+
+def to_record(row):
+    """
+    Convert a match row to the values of one matches table row, in COLUMNS order.
+
+    Scores and seeds become integers ("retired" and blanks become NULL), as in
+    the Parquet dataset, and the year and gender are split out of the Match Id.
+
+    Args:
+        row (list): Row in CSV_HEADER column order
+
+    Returns:
+        tuple: Values for the matches table
+    """
+    values = []
+    for header, value in zip(CSV_HEADER, row):
+        if header in INT_COLUMNS:
+            values.append(_to_int(value))
+        elif header in FLAG_COLUMNS:
+            values.append(_to_int(value) or 0)
+        else:
+            values.append(str(value))
+    year, gender = str(row[0]).split('_')[:2]
+    return (*values, int("retired" in row), _to_int(year), gender)
+
+
+class MatchStore:
+    """
+    SQLite database of match rows, keyed on Match Id.
+
+    Rows are upserted in batches, one transaction per batch, so re-processing a
+    year updates its matches in place instead of adding duplicates. The
+    database runs in WAL mode, so queries are not blocked while a run writes,
+    and the name, country, year, gender and round columns are indexed.
+    """
+
+    def __init__(self, path="matches.db", batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = [f"{column_name(header)} {_sql_type(header)}" for header in CSV_HEADER]
+        columns[0] += " PRIMARY KEY"
+        columns += ["retired INTEGER NOT NULL DEFAULT 0", "year INTEGER", "gender TEXT"]
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS matches ({', '.join(columns)})")
+            for column in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_matches_{column} ON matches ({column})")
+
+    def upsert(self, match_rows):
+        """
+        Insert match rows, replacing the stored row of any Match Id already present.
+
+        Args:
+            match_rows (iterable): Match records, or rows in CSV_HEADER column order
+
+        Returns:
+            int: Number of rows written
+        """
+        updates = ', '.join(f"{column} = excluded.{column}" for column in COLUMNS[1:])
+        sql = (f"INSERT INTO matches ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+               f"ON CONFLICT (match_id) DO UPDATE SET {updates}")
+        count = 0
+        batch = []
+        for row in iter_rows(match_rows):
+            batch.append(to_record(row))
+            if len(batch) >= self.batch_size:
+                with self.conn:
+                    self.conn.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            with self.conn:
+                self.conn.executemany(sql, batch)
+            count += len(batch)
+        return count
+
+    def import_csv(self, csv_path):
+        """Upsert every row of a CSV written by write_to_csv; returns the number of rows."""
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return self.upsert(row for row in reader if row and row[0])
+
+    def player_matches(self, name):
+        """Return every match a player won or lost, ordered by Match Id."""
+        return self.conn.execute(
+            "SELECT * FROM matches WHERE w_name = ? UNION ALL SELECT * FROM matches WHERE l_name = ? "
+            "ORDER BY match_id", (name, name)).fetchall()
+
+    def query(self, sql, params=()):
+        """Run a read query against the matches table and return its rows."""
+        return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_to_sqlite(match_rows, db_path="matches.db"):
+    """
+    Upsert match rows into a SQLite match store.
+
+    Args:
+        match_rows (list): Match records, or rows in CSV_HEADER column order
+        db_path (str): Path of the database file
+    """
+    if not match_rows:
+        return
+    with MatchStore(db_path) as store:
+        count = store.upsert(match_rows)
+    print(f"Data has been written to {db_path} ({count} rows)")
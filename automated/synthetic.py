@@ -0,0 +1,253 @@
+import argparse
+import random
+import sys
+from collections import namedtuple
+
+# Result formats parse_round_results recognises:
+#   two_line  "K. Kanepi [1]" then ".........6/1 6/2" on the next line
+#   dotted    "K. Kanepi [1]..............6/1 6/2"
+#   fallback  "K. Kanepi [1] 6/1 6/2" (no dot leaders at all)
+FORMATS = ("two_line", "dotted", "fallback")
+
+# The layout of the real draws: dotted results, with the Qualifiers round in two-line format
+REAL_LAYOUT = ("dotted", "dotted", "two_line")
+
+# Result rounds of a qualifying draw and the labels the parser gives them
+RESULT_ROUNDS = [("Second Round", "R128", "128"), ("Third Round", "R64", "64"), ("Qualifiers", "R32", "32")]
+
+MIN_SIZE = 32
+MAX_SIZE = 1024
+
+COUNTRIES = ["ARG", "AUS", "AUT", "BEL", "BRA", "CAN", "CHN", "CRO", "CZE", "ESP", "FRA", "GBR", "GER", "IND",
+             "ITA", "JPN", "NED", "RSA", "RUS", "SRB", "SUI", "SWE", "UKR", "USA"]
+
+_ONSETS = ["B", "D", "F", "G", "K", "L", "M", "N", "P", "R", "S", "T", "V", "Z", "Br", "Ch", "Kr", "St", "Tr"]
+_VOWELS = ["a", "e", "i", "o", "u", "ai", "ei", "ou"]
+_CODAS = ["", "", "n", "r", "s", "k", "l", "v", "z"]
+
+# Expected parse of one synthetic match; sets are (winner, loser) games, with
+# ("retired", "") after the last set of a retirement and no sets for a walkover
+SyntheticMatch = namedtuple("SyntheticMatch", ["match_id", "round_label", "winner", "loser", "sets"])
+SyntheticDraw = namedtuple("SyntheticDraw", ["text", "matches"])
+
+
+def _word(rng, syllables):
+    return ''.join(rng.choice(_ONSETS).lower() + rng.choice(_VOWELS) + rng.choice(_CODAS)
+                   for _ in range(syllables)).capitalize()
+
+
+def player_names(rng, count):
+    """
+    Return count distinct full names. Last names are unique, so every winner
+    abbreviation identifies exactly one player; some first names are
+    hyphenated ("Hai-Tao"), as in the real draws.
+    """
+    names = []
+    last_names = set()
+    while len(names) < count:
+        last_name = _word(rng, rng.choice((2, 3)))
+        if last_name in last_names:
+            continue
+        last_names.add(last_name)
+        first_name = _word(rng, 2)
+        if rng.random() < 0.05:
+            first_name = f"{first_name}-{_word(rng, 1)}"
+        names.append(f"{first_name} {last_name}")
+    return names
+
+
+def abbreviate(name, seed):
+    """Return the winner abbreviation of a player, e.g. "H-T. Lee [4]"."""
+    first_name, last_name = name.rsplit(' ', 1)
+    initials = '-'.join(part[0] for part in first_name.split('-'))
+    return f"{initials}. {last_name}" + (f" [{seed}]" if seed else "")
+
+
+def seed_positions(size, seeds):
+    """Draw positions (0-based) of seeds 1..seeds, spread evenly over the draw."""
+    block = size // seeds
+    return [(k * block if k % 2 == 0 else k * block + block - 1) for k in range(seeds)]
+
+
+def _score_set(rng):
+    # (winner games, loser games, tiebreak points of the set loser or None)
+    loser = rng.choice((0, 1, 2, 3, 4, 5, 6))
+    if loser == 5:
+        return 7, 5, None
+    if loser == 6:
+        return 7, 6, rng.randint(0, 9)
+    return 6, loser, None
+
+
+def play_match(rng, best_of, retirement_rate, walkover_rate):
+    """
+    Return the sets of one match, from the winner's point of view.
+
+    Each set is (winner games, loser games, tiebreak), where tiebreak is the
+    set loser's tiebreak points or None. A walkover has no sets; a retirement
+    stops during a set after at least one completed set and ends with
+    ("retired", "", None).
+    """
+    if rng.random() < walkover_rate:
+        return []
+    needed = best_of // 2 + 1
+    sets = []
+    won = lost = 0
+    retire_after = rng.randint(1, best_of - 1) if rng.random() < retirement_rate else None
+    while won < needed:
+        if retire_after is not None and len(sets) == retire_after:
+            # A partial set, in either player's favour, then the loser retires
+            return sets + [(rng.randint(0, 5), rng.randint(0, 5), None), ("retired", "", None)]
+        games, other, tiebreak = _score_set(rng)
+        if lost < needed - 1 and rng.random() < 0.3:
+            sets.append((other, games, tiebreak))
+            lost += 1
+        else:
+            sets.append((games, other, tiebreak))
+            won += 1
+    return sets
+
+
+def format_score(sets, tiebreaks=True):
+    """Render sets as in the draws, e.g. "4/6 7/6(4) 6/2", "6/3 2/1 retired" or "wo."."""
+    if not sets:
+        return "wo."
+    parts = []
+    for winner_games, loser_games, tiebreak in sets:
+        if winner_games == "retired":
+            parts.append("retired")
+        else:
+            parts.append(f"{winner_games}/{loser_games}" + (f"({tiebreak})" if tiebreaks and tiebreak is not None
+                                                            else ""))
+    return ' '.join(parts)
+
+
+def _dots(rng):
+    return '.' * rng.randint(20, 60)
+
+
+def add_ocr_noise(rng, abbr, score):
+    """
+    Corrupt a result the way a poor OCR pass does: a misread digit in the
+    score ("l/6", "O/6"), a dropped or doubled letter in the last name, or
+    stray spaces. Name typos send the parser to its fallbacks.
+    """
+    kind = rng.choice(("digit", "name", "spacing"))
+    if kind == "digit" and ("1/" in score or "0/" in score):
+        return abbr, score.replace("1/", "l/", 1) if "1/" in score else score.replace("0/", "O/", 1)
+    if kind == "name":
+        initials, rest = abbr.split(". ", 1)
+        last_name, _, seed = rest.partition(" [")
+        k = rng.randrange(1, len(last_name))
+        # Drop the k-th letter, or read it twice
+        last_name = last_name[:k] + last_name[k + 1:] if rng.random() < 0.5 else last_name[:k + 1] + last_name[k:]
+        return f"{initials}. {last_name}" + (f" [{seed}" if seed else ""), score
+    return abbr.replace(". ", ".  ", 1), score.replace(" ", "  ")
+
+
+def format_result(rng, fmt, abbr, score):
+    """Return the line(s) of one result in the given format."""
+    if fmt == "two_line":
+        return [abbr, f"{_dots(rng)}{score}"]
+    if fmt == "dotted":
+        return [f"{abbr}{_dots(rng)}{' ' if rng.random() < 0.3 else ''}{score}"]
+    return [f"{abbr} {score}"]
+
+
+def generate_draw(size=128, formats="dotted", seed=0, year=2030, gender="M", seeds=None,
+                  wildcard_rate=0.05, retirement_rate=0.03, walkover_rate=0.01, noise=0.0):
+    """
+    Generate the text of a synthetic qualifying draw and the matches it holds.
+
+    The text has the layout of extract_text_from_pdf output: a title, the
+    First Round entry list and one result section per round (Second Round,
+    Third Round, Qualifiers), so process_tournament_text(text,
+    preprocess=False) parses it. The same arguments always give the same draw.
+
+    The fallback format cannot express tiebreak points, more than three sets
+    or walkovers, so its rounds are best of three with neither.
+
+    Args:
+        size (int): Number of players, a power of two from 32 to 1024
+        formats (str or tuple): One of FORMATS for every result round, or one per
+            round (e.g. REAL_LAYOUT)
+        seed (int): Random seed
+        year (int): Year in the title and Match Ids
+        gender (str): "M" (best of five in the Qualifiers round) or "W"
+        seeds (int): Number of seeded players (default a quarter of the draw, at most 32)
+        wildcard_rate (float): Share of unseeded players given a wildcard
+        retirement_rate (float): Share of matches ending in a retirement
+        walkover_rate (float): Share of matches ending in a walkover
+        noise (float): Share of result lines corrupted by add_ocr_noise
+
+    Returns:
+        SyntheticDraw: (text, matches), matches being SyntheticMatch tuples in
+            the order the parser yields them
+    """
+    if size < MIN_SIZE or size > MAX_SIZE or size & (size - 1):
+        raise ValueError(f"Draw size must be a power of two from {MIN_SIZE} to {MAX_SIZE}, got {size}")
+    formats = (formats,) * len(RESULT_ROUNDS) if isinstance(formats, str) else tuple(formats)
+    if len(formats) != len(RESULT_ROUNDS) or any(fmt not in FORMATS for fmt in formats):
+        raise ValueError(f"Formats must be one of {FORMATS} or one per round, got {formats}")
+    rng = random.Random(seed)
+    seeds = min(32, size // 4) if seeds is None else seeds
+
+    names = player_names(rng, size)
+    seeding = [None] * size
+    for k, position in enumerate(seed_positions(size, seeds) if seeds else []):
+        seeding[position] = k + 1
+    players = [(names[i], seeding[i], rng.choice(COUNTRIES), not seeding[i] and rng.random() < wildcard_rate)
+               for i in range(size)]
+
+    title = "Gentlemen's" if gender == "M" else "Ladies'"
+    lines = [f"The Championships {year}", f"Qualifying {title} Singles", "First Round"]
+    for num, (name, player_seed, country, wild) in enumerate(players, 1):
+        entry = f"{num}. {name}" + (f" [{player_seed}]" if player_seed else "")
+        lines.append(("(WC) " if wild else "") + f"{entry}{_dots(rng)}({country})")
+
+    matches = []
+    field = players
+    for (header, round_label, round_num), fmt in zip(RESULT_ROUNDS, formats):
+        lines.append(header)
+        best_of = 5 if gender == "M" and header == "Qualifiers" and fmt != "fallback" else 3
+        winners = []
+        for j in range(0, len(field), 2):
+            p1, p2 = field[j], field[j + 1]
+            # Seeds win more often
+            favourite = p1 if (p1[1] or 99) <= (p2[1] or 99) else p2
+            winner = favourite if rng.random() < 0.7 else (p2 if favourite is p1 else p1)
+            loser = p2 if winner is p1 else p1
+            sets = play_match(rng, best_of, retirement_rate, 0.0 if fmt == "fallback" else walkover_rate)
+            abbr = abbreviate(winner[0], winner[1])
+            score = format_score(sets, tiebreaks=fmt != "fallback")
+            if noise and rng.random() < noise:
+                abbr, score = add_ocr_noise(rng, abbr, score)
+            lines.extend(format_result(rng, fmt, abbr, score))
+            matches.append(SyntheticMatch(f"{year}_{gender}_{round_num}_{j // 2 + 1}", round_label,
+                                          winner[0], loser[0],
+                                          tuple((str(w), str(l)) for w, l, _ in sets)))
+            winners.append(winner)
+        field = winners
+
+    return SyntheticDraw('\n'.join(lines) + '\n', matches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print a synthetic qualifying draw")
+    parser.add_argument("--size", type=int, default=128, help="number of players (32 to 1024)")
+    parser.add_argument("--format", default="dotted", choices=FORMATS + ("real",),
+                        help="result format of every round; real mixes them as the draws do")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--year", type=int, default=2030)
+    parser.add_argument("--gender", default="M", choices=("M", "W"))
+    parser.add_argument("--noise", type=float, default=0.0, help="share of results with OCR noise")
+    args = parser.parse_args(argv)
+
+    formats = REAL_LAYOUT if args.format == "real" else args.format
+    draw = generate_draw(args.size, formats, args.seed, args.year, args.gender, noise=args.noise)
+    sys.stdout.write(draw.text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
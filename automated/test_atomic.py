@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from atomic import atomic_write
+
+
+def test_replace_keeps_the_file_mode(tmp_path):
+    path = tmp_path / "output.csv"
+    path.write_text("old")
+    os.chmod(path, 0o644)
+
+    with atomic_write(str(path)) as f:
+        f.write("new")
+
+    assert path.read_text() == "new"
+    assert path.stat().st_mode & 0o777 == 0o644
+
+
+def test_failed_write_leaves_the_file_alone(tmp_path):
+    path = tmp_path / "output.csv"
+    path.write_bytes(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), 'wb') as f:
+            f.write(b"new")
+            raise RuntimeError("interrupted")
+
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["output.csv"]
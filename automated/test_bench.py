@@ -0,0 +1,29 @@
+import json
+
+from bench import STAGES, bundled_inputs, compare, main, run_benchmark
+
+
+def test_every_stage_is_timed_and_measured():
+    embedded = [entry for entry in bundled_inputs() if entry[1] is None]
+    results = run_benchmark(embedded, repeat=1)
+
+    entry = results["inputs"]["2010_QS_W (embedded)"]
+    assert entry["matches"] > 0
+    assert list(entry["stages"]) == [stage for stage in STAGES if stage != "extract"]
+    for summary in entry["stages"].values():
+        assert summary["runs"] == 1 and summary["median"] >= 0 and summary["peak_bytes"] > 0
+
+
+def test_compare_flags_slower_stages():
+    stages = {"preprocess": {"median": 0.002}, "matching": {"median": 0.001}}
+    baseline = {"inputs": {"draw": {"stages": {"preprocess": {"median": 0.001}, "matching": {"median": 0.001}}}}}
+
+    assert compare({"inputs": {"draw": {"stages": stages}}}, baseline) == [("draw", "preprocess", 0.001, 0.002)]
+
+
+def test_main_writes_json_results(tmp_path):
+    output = tmp_path / "bench.json"
+
+    assert main(["--repeat", "1", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert results["repeat"] == 1 and "2002_QS_M.pdf" in results["inputs"]
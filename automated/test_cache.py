@@ -0,0 +1,82 @@
+import os
+import time
+
+import pytest
+
+import text
+from cache import ExtractionCache, hash_bytes, hash_file
+
+DOWNLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "downloads")
+PDF_PATH = os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf")
+
+
+def test_cached_text_skips_pdf_decoding(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path))
+    first = text.extract_text_cached(PDF_PATH, cache)
+
+    monkeypatch.setattr(text, "extract_text_from_pdf", lambda path: pytest.fail("PDF should not be decoded on a cache hit"))
+    assert text.extract_text_cached(PDF_PATH, cache) == first
+
+
+def test_rows_are_keyed_by_parser_version(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    pdf_hash = hash_file(PDF_PATH)
+    cache.put_rows(pdf_hash, "1", "1", [["2002_M_128_1", "R128"]])
+
+    assert cache.get_rows(pdf_hash, "1", "1") == [["2002_M_128_1", "R128"]]
+    assert cache.get_rows(pdf_hash, "1", "2") is None
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=250)
+    cache.put_text("a", "1", "x" * 100)
+    cache.put_text("b", "1", "y" * 100)
+    time.sleep(0.01)
+    cache.get_text("a", "1")
+    time.sleep(0.01)
+    cache.put_text("c", "1", "z" * 100)
+
+    assert cache.get_text("a", "1") is not None
+    assert cache.get_text("b", "1") is None
+    assert cache.get_text("c", "1") is not None
+
+
+
+def test_in_memory_pdf_is_hashed_and_extracted_without_reading_the_file(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path))
+    data = text.read_pdf_bytes(PDF_PATH)
+    assert hash_bytes(data) == hash_file(PDF_PATH)
+
+    monkeypatch.setattr(text, "hash_file", lambda path: pytest.fail("the buffer should be hashed"))
+    missing_path = str(tmp_path / "not_on_disk.pdf")
+    assert text.extract_text_cached(missing_path, cache, data=data) == text.extract_text_from_pdf(PDF_PATH)
+    assert cache.get_text(hash_bytes(data), text.EXTRACTOR_VERSION) is not None
+
+
+def test_eviction_skips_entries_removed_by_another_process(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path), max_bytes=150)
+    cache.put_text("a", "1", "x" * 100)
+    scandir = os.scandir
+
+    class VanishedEntry:
+        # An entry listed by scandir and evicted by another worker before stat()
+        name = path = "vanished.json"
+
+        def is_file(self):
+            return True
+
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    class Listing:
+        def __enter__(self):
+            self.it = scandir(str(tmp_path))
+            return [VanishedEntry(), *self.it.__enter__()]
+
+        def __exit__(self, *exc_info):
+            return self.it.__exit__(*exc_info)
+
+    monkeypatch.setattr(os, "scandir", lambda path: Listing())
+    cache.put_text("b", "1", "y" * 100)
+
+    assert cache.get_text("b", "1") is not None
@@ -0,0 +1,39 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from columnar import rows_to_table, write_to_parquet
+
+
+def make_row(match_id, w_scores, l_scores):
+    w_p = [1 if s and s != "retired" else 0 for s in w_scores]
+    l_p = [1 if s else 0 for s in l_scores]
+    return [match_id, "R128", "Roberta Vinci", "1", "", "ITA", *w_scores, *w_p, sum(w_p),
+            "Lioudmila Skavronskaia", "", "1", "RUS", *l_scores, *l_p, sum(l_p)]
+
+
+def test_scores_and_flags_are_integers():
+    table = rows_to_table([make_row("2004_W_128_1", ["6", "3", "retired", "", ""], ["3", "1", "", "", ""])])
+
+    assert table.schema.field("W_set1").type == pa.int16()
+    assert table.schema.field("W_set1_p").type == pa.int8()
+    row = table.to_pylist()[0]
+    assert row["W_set1"] == 6 and row["W_set3"] is None
+    assert row["W_seed"] == 1 and row["L_seed"] is None
+    assert row["L_Wc"] == 1 and row["W_Wc"] == 0
+    assert row["retired"] is True
+    assert (row["year"], row["gender"]) == (2004, "W")
+
+
+def test_partitions_are_replaced_on_rewrite(tmp_path):
+    root = str(tmp_path / "parquet")
+    rows = [make_row("2004_W_128_1", ["6", "6", "", "", ""], ["3", "4", "", "", ""])]
+
+    write_to_parquet(rows, root)
+    write_to_parquet(rows, root)
+    write_to_parquet([make_row("2003_M_128_1", ["6", "6", "", "", ""], ["0", "0", "", "", ""])], root)
+
+    assert (tmp_path / "parquet" / "year=2004" / "gender=W").is_dir()
+    table = pq.read_table(root, columns=["Match Id", "W_set1"])
+    assert sorted(table.column("Match Id").to_pylist()) == ["2003_M_128_1", "2004_W_128_1"]
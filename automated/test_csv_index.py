@@ -0,0 +1,131 @@
+import csv
+import os
+import stat
+
+import pytest
+
+from csv_index import IncrementalCSVWriter
+from final import CSV_HEADER, write_to_csv
+
+
+def make_rows(year, gender, winners):
+    return [[f"{year}_{gender}_128_{i + 1}", "R128", name] + [""] * 29 for i, name in enumerate(winners)]
+
+
+def read_ids(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row[0] for row in csv.reader(f)][1:]
+
+
+def test_rewriting_a_year_does_not_duplicate_rows(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    rows = make_rows(2004, "W", ["Roberta Vinci", "Lilia Osterloh"])
+
+    write_to_csv(rows, output_file)
+    write_to_csv(rows, output_file)
+
+    assert read_ids(output_file) == ["2004_W_128_1", "2004_W_128_2"]
+
+
+def test_changed_tournament_is_replaced_in_place(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    writer = IncrementalCSVWriter(output_file, CSV_HEADER)
+    writer.write(make_rows(2003, "M", ["A"]) + make_rows(2004, "W", ["B", "C"]) + make_rows(2005, "M", ["D"]))
+
+    stats = IncrementalCSVWriter(output_file, CSV_HEADER).write(make_rows(2004, "W", ["B", "E"]))
+
+    assert stats == {"written": 0, "skipped": 0, "replaced": 2}
+    with open(output_file, newline="", encoding="utf-8") as f:
+        names = {row[0]: row[2] for row in csv.reader(f)}
+    assert names["2004_W_128_2"] == "E"
+    # The replaced tournament keeps its place, so the file stays in year order
+    assert read_ids(output_file) == ["2003_M_128_1", "2004_W_128_1", "2004_W_128_2", "2005_M_128_1"]
+
+
+def test_interrupted_append_is_rolled_back(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    IncrementalCSVWriter(output_file, CSV_HEADER).write(make_rows(2002, "M", ["A"]))
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write("2003_M_128_1,R128,partial")
+
+    stats = IncrementalCSVWriter(output_file, CSV_HEADER).write(make_rows(2003, "M", ["B"]))
+
+    assert stats["written"] == 1
+    assert read_ids(output_file) == ["2002_M_128_1", "2003_M_128_1"]
+
+
+def test_rows_appended_without_the_index_are_kept(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    write_to_csv(make_rows(2002, "M", ["A"]), output_file)
+    write_to_csv(make_rows(2003, "M", ["B"]), output_file, incremental=False)
+    write_to_csv(make_rows(2004, "M", ["C"]), output_file)
+
+    assert read_ids(output_file) == ["2002_M_128_1", "2003_M_128_1", "2004_M_128_1"]
+
+
+def test_failed_write_leaves_the_file_as_indexed(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    IncrementalCSVWriter(output_file, CSV_HEADER).write(make_rows(2002, "M", ["A"]))
+
+    def rows():
+        yield from make_rows(2003, "M", ["B", "C"])
+        raise RuntimeError("parse failed")
+
+    with pytest.raises(RuntimeError):
+        IncrementalCSVWriter(output_file, CSV_HEADER).write(rows())
+
+    assert read_ids(output_file) == ["2002_M_128_1"]
+
+
+def test_replacing_a_tournament_keeps_the_file_mode(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    writer = IncrementalCSVWriter(output_file, CSV_HEADER)
+    writer.write(make_rows(2004, "W", ["B", "C"]))
+    os.chmod(output_file, 0o644)
+
+    writer.write(make_rows(2004, "W", ["B", "E"]))
+
+    assert stat.S_IMODE(os.stat(output_file).st_mode) == 0o644
+
+
+def test_existing_csv_without_index_is_deduplicated(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    write_to_csv(make_rows(2002, "M", ["A", "B"]), output_file, incremental=False)
+    write_to_csv(make_rows(2002, "M", ["A", "B"]), output_file, incremental=False)
+
+    stats = IncrementalCSVWriter(output_file, CSV_HEADER).write(make_rows(2002, "M", ["A", "B"]))
+
+    assert stats["skipped"] == 2
+    assert read_ids(output_file) == ["2002_M_128_1", "2002_M_128_2"]
+
+
+def test_rows_are_streamed_before_the_input_is_exhausted(tmp_path):
+    output_file = str(tmp_path / "output.csv")
+    writer = IncrementalCSVWriter(output_file, CSV_HEADER)
+    sizes = []
+
+    def rows():
+        for row in make_rows(2010, "W", ["A", "B", "C"]):
+            yield row
+            sizes.append(os.path.getsize(output_file))
+
+    stats = writer.write(rows())
+
+    assert stats["written"] == 3
+    assert sizes[0] < sizes[1] < sizes[2]
+    assert read_ids(output_file) == ["2010_W_128_1", "2010_W_128_2", "2010_W_128_3"]
+
+
+def test_streamed_process_tournament_matches_list_output(tmp_path):
+    from bench_preprocess import load_embedded_sample
+    from final import iter_tournament_matches, process_tournament_text
+
+    text = load_embedded_sample()
+    streamed_file = str(tmp_path / "streamed.csv")
+    listed_file = str(tmp_path / "listed.csv")
+
+    write_to_csv(iter_tournament_matches(text, preprocess=False), streamed_file)
+    write_to_csv(process_tournament_text(text, preprocess=False), listed_file)
+
+    with open(streamed_file, "rb") as streamed, open(listed_file, "rb") as listed:
+        assert streamed.read() == listed.read()
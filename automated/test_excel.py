@@ -0,0 +1,79 @@
+import csv
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+EXCEL_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper", "excel.py")
+
+HEADER = ["Match Id", "Round", "W_name", "W_seed", "W_set1"]
+ROWS = [
+    ["2002_M_128_1", "R128", "Roberta Vinci", "1", "6"],
+    ["2002_M_128_2", "R128", "Lilia Osterloh", "", "7"],
+    ["2003_M_128_1", "R128", "Kaia Kanepi", "12", "retired"],
+    ["2003_M_128_2", "R128", "Olga Savchuk", "", ""],
+    ["2004_W_128_1", "R128", "Tamira Paszek", "3", "0"],
+]
+
+
+def load_excel():
+    # scraper/ is not on sys.path; the script is loaded from its path
+    spec = importlib.util.spec_from_file_location("scraper_excel", EXCEL_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([HEADER, *rows])
+
+
+def read_sheets(path):
+    workbook = openpyxl.load_workbook(path)
+    sheets = {sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook.worksheets}
+    workbook.close()
+    return sheets
+
+
+def test_rows_are_streamed_across_chunks(tmp_path):
+    csv_file = tmp_path / "output.csv"
+    xlsx_file = tmp_path / "output.xlsx"
+    write_csv(csv_file, ROWS)
+
+    assert load_excel().convert_csv_to_xlsx(str(csv_file), str(xlsx_file), chunk_size=2) == len(ROWS)
+
+    rows = read_sheets(xlsx_file)["Sheet1"]
+    assert rows[0] == HEADER
+    assert [row[0] for row in rows[1:]] == [row[0] for row in ROWS]
+
+
+def test_numbers_become_integers_and_blanks_stay_empty(tmp_path):
+    csv_file = tmp_path / "output.csv"
+    xlsx_file = tmp_path / "output.xlsx"
+    write_csv(csv_file, ROWS)
+
+    load_excel().convert_csv_to_xlsx(str(csv_file), str(xlsx_file))
+
+    rows = read_sheets(xlsx_file)["Sheet1"]
+    assert rows[1] == ["2002_M_128_1", "R128", "Roberta Vinci", 1, 6]
+    assert rows[2][3] is None
+    assert rows[3][3:] == [12, "retired"]
+    assert rows[4][3:] == [None, None]
+
+
+def test_split_by_year_writes_one_sheet_per_year(tmp_path):
+    write_csv(tmp_path / "output.csv", ROWS)
+
+    result = subprocess.run([sys.executable, EXCEL_SCRIPT, "--split-by-year"], cwd=tmp_path,
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    sheets = read_sheets(tmp_path / "output.xlsx")
+    assert list(sheets) == ["2002", "2003", "2004"]
+    assert all(rows[0] == HEADER for rows in sheets.values())
+    assert [len(rows) - 1 for rows in sheets.values()] == [2, 2, 1]
@@ -1,5 +1,10 @@
 import os
+import shutil
 import subprocess
+import sys
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def test_final_script():
     """Test the final.py script with a small sample of tournament data"""
@@ -15,13 +20,16 @@ K. Kanepi [1]..............................................6/1 7/5
     """
     
     print("Testing final.py with sample data...")
+    work_dir = tempfile.mkdtemp()
     try:
         # Run final.py with sample data as input
+        # In a scratch directory, so the tracked output.csv is left alone
         result = subprocess.run(
-            ["python", "final.py"],
+            [sys.executable, os.path.join(SCRIPT_DIR, "final.py")],
             input=sample_data,  # No need to encode here - subprocess will handle it
             capture_output=True,
-            text=True
+            text=True,
+            cwd=work_dir
         )
         
         print("Output from final.py:")
@@ -32,9 +40,10 @@ K. Kanepi [1]..............................................6/1 7/5
             print(result.stderr)
             
         # Check if output.csv was created
-        if os.path.exists("output.csv"):
+        output_file = os.path.join(work_dir, "output.csv")
+        if os.path.exists(output_file):
             print("Success! output.csv was created/updated.")
-            with open("output.csv", "r") as f:
+            with open(output_file, "r") as f:
                 lines = f.readlines()
                 print(f"CSV contains {len(lines)} lines (including header)")
         else:
@@ -44,6 +53,141 @@ K. Kanepi [1]..............................................6/1 7/5
     except Exception as e:
         print(f"Error testing final.py: {e}")
         return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_preprocess_text_matches_legacy_passes():
+    """The single-pass preprocess_text must produce the same text as the old multi-pass version"""
+    import random
+    from bench_preprocess import legacy_preprocess_text, load_embedded_sample
+    from final import preprocess_text
+
+    samples = [
+        load_embedded_sample(),
+        "  12 .First Round 3.\n\nSecond\tRound [ 4 ] l/6 O/2 6/1. ....Qualifiers ",
+        "",
+        " \n ",
+    ]
+    alphabet = ["First Round", "Second Round", "Third Round", "Qualifiers", "First\nRound",
+                "1", "23", ".", " ", "\n", "\t", "[", "]", "l/", "O/", "l", "O", "/", "K", " "]
+    rng = random.Random(0)
+    samples += ["".join(rng.choice(alphabet) for _ in range(60)) for _ in range(500)]
+
+    for sample in samples:
+        assert preprocess_text(sample) == legacy_preprocess_text(sample), repr(sample)
+
+
+def test_index_rounds_splits_each_round_once():
+    from final import index_rounds
+
+    order, round_lines = index_rounds("The Championships 2010\nFirst Round\nFirst Round\n1. A\n\n 2. B \n"
+                                      "Second Round\nA. ....6/1 6/2\nQualifiers\nA.")
+
+    assert order == ["First Round", "First Round", "Second Round", "Qualifiers"]
+    assert round_lines["First Round"] == ["1. A", "2. B"]
+    assert round_lines["Second Round"] == ["A. ....6/1 6/2"]
+    assert round_lines["Qualifiers"] == ["A."]
+
+
+def test_process_line_structured_draw():
+    """Text that is already one entry per line can be parsed without preprocessing"""
+    from bench_preprocess import load_embedded_sample
+    from final import process_tournament_text
+
+    match_rows = process_tournament_text(load_embedded_sample(), preprocess=False)
+
+    assert len(match_rows) == 84
+    assert match_rows[0].to_row()[:6] == ["2010_W_128_1", "R128", "Kaia Kanepi", "1", "", "EST"]
+    assert match_rows[-1].match_id == "2010_W_32_12"
+
+
+def test_name_index_resolves_winners():
+    from final import Player, abbreviation_key, build_name_index, resolve_winner
+
+    p1 = Player(1, "Bethanie Mattek-Sands")
+    p2 = Player(2, "Jean-Luc Mattek-Sands")
+    # A player of another match with a matching name is never a candidate
+    name_index = build_name_index([p1, p2, Player(3, "Kaia Kanepi")])
+
+    assert abbreviation_key("J.-L. Mattek-Sands [4]") == ("MATTEK-SANDS", ("J", "L"))
+    assert resolve_winner(abbreviation_key("J.-L. Mattek-Sands"), p1, p2, name_index, False) is p2
+    assert resolve_winner(abbreviation_key("B. Mattek-Sands [4]"), p1, p2, name_index, False) is p1
+    assert resolve_winner(abbreviation_key("X. Y. Mattek-Sands"), p1, p2, name_index, False) is None
+    assert resolve_winner(abbreviation_key("X. Y. Mattek-Sands"), p1, p2, name_index, True) is p1
+    assert resolve_winner(abbreviation_key("K. Kanepi"), p1, p2, name_index, True) is None
+
+
+SCRAPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper", "final.py")
+
+
+def test_importing_the_scraper_script_does_no_work(tmp_path, monkeypatch, capsys):
+    """scraper/final.py only parses when run, so importing it is cheap and writes nothing"""
+    import importlib.util
+
+    monkeypatch.chdir(tmp_path)
+    spec = importlib.util.spec_from_file_location("scraper_final", SCRAPER_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    assert module.input_text.lstrip().startswith("The Championships 2010")
+    assert callable(module.main)
+    assert list(tmp_path.iterdir()) == []
+    assert capsys.readouterr().out == ""
+
+
+def test_scraper_script_uses_the_shared_parser(tmp_path):
+    """Running scraper/final.py writes the embedded draw through automated/final.py"""
+    import csv
+    import sys
+
+    result = subprocess.run([sys.executable, SCRAPER_SCRIPT], cwd=tmp_path, stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    with open(tmp_path / "output.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 1 + 48 + 24 + 12
+    assert rows[1][:3] == ["2010_W_128_1", "R128", "Kaia Kanepi"]
+    # Per-match lines are only printed with --verbose
+    assert " beat " not in result.stdout
+
+def test_scraper_script_imported_as_final_still_finds_the_parser(tmp_path, monkeypatch):
+    """scraper/final.py loads the shared parser by path, so its own module name does not matter"""
+    import importlib.util
+    import io
+
+    spec = importlib.util.spec_from_file_location("final", SCRAPER_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "final", module)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(sys, "stdin", io.StringIO(""))
+    output_file = tmp_path / "output.csv"
+
+    assert module.main(["--output", str(output_file)]) == 0
+    assert len(output_file.read_text(encoding="utf-8").splitlines()) == 1 + 48 + 24 + 12
+
+
+def test_scraper_script_writes_the_sqlite_store(tmp_path):
+    """scraper/final.py --sqlite upserts the draw into the same match store as the pipeline"""
+    from store import MatchStore
+
+    db_path = tmp_path / "matches.db"
+    result = subprocess.run([sys.executable, SCRAPER_SCRIPT, "--sqlite", str(db_path)], cwd=tmp_path,
+                            stdin=subprocess.DEVNULL, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    with MatchStore(str(db_path)) as store:
+        assert store.query("SELECT COUNT(*) FROM matches")[0][0] == 48 + 24 + 12
+
+
+def test_output_without_a_path_is_a_usage_error():
+    import pytest
+    from final import main
+
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--output"])
+    assert excinfo.value.code == 2
+
 
 if __name__ == "__main__":
-    test_final_script()
\ No newline at end of file
+    test_final_script()
@@ -0,0 +1,26 @@
+import pytest
+
+from jobs import expand_job_spec, job_key, parse_years, url_template_from
+
+
+def test_expand_job_spec_dedupes_and_orders_by_priority():
+    jobs = expand_job_spec([
+        {"years": "2002-2003", "events": ["QS", "MS", "LS"], "url_template": "http://x/{year}_{event}.pdf"},
+        {"years": [2003], "genders": ["W"], "events": ["QS_W"], "priority": 5},
+    ])
+
+    assert [job_key(job) for job in jobs] == [
+        "2003_QS_W",
+        "2002_LS", "2002_MS", "2002_QS_M", "2002_QS_W",
+        "2003_LS", "2003_MS", "2003_QS_M",
+    ]
+    assert jobs[0].priority == 5 and jobs[0].url.endswith("/draws/2003_QS_W.pdf")
+    assert jobs[1].gender == "W" and jobs[1].filename == "2002_LS.pdf"
+
+
+def test_parse_years_and_url_template():
+    assert parse_years(["2002-2004", 2008, "2010,2012"]) == [2002, 2003, 2004, 2008, 2010, 2012]
+    assert url_template_from("https://host/draws/2002_QS_M.pdf") == "https://host/draws/{year}_{event}.pdf"
+    with pytest.raises(ValueError):
+        url_template_from("https://host/draws/2002_QS_A4.pdf")
+
@@ -0,0 +1,31 @@
+from journal import Journal
+
+
+def test_latest_entry_wins_and_torn_lines_are_ignored(tmp_path):
+    path = str(tmp_path / "pipeline.journal.jsonl")
+    journal = Journal(path)
+    journal.record("2002_QS_M", "download", "done", sha256="abc")
+    journal.record("2002_QS_M", "write", "failed", error="disk full")
+    journal.record("2002_QS_M", "write", "done", matches=112, version="2.1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"pdf": "2003_QS_M", "sta')
+
+    journal = Journal(path)
+    assert journal.state("2002_QS_M", "download")["sha256"] == "abc"
+    assert journal.is_done("2002_QS_M")
+    assert journal.is_done("2002_QS_M", "write", version="2.1")
+    assert not journal.is_done("2002_QS_M", "write", version="3.1")
+    assert not journal.is_done("2003_QS_M", "download")
+
+
+def test_record_after_a_torn_line_is_kept(tmp_path):
+    path = str(tmp_path / "pipeline.journal.jsonl")
+    Journal(path).record("2002_QS_M", "download", "done")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"pdf": "2002_QS_M", "sta')
+
+    Journal(path).record("2002_QS_M", "write", "done", matches=112)
+
+    journal = Journal(path)
+    assert journal.is_done("2002_QS_M", "download")
+    assert journal.is_done("2002_QS_M")
@@ -0,0 +1,73 @@
+import json
+
+from bench_preprocess import load_embedded_sample
+from final import process_tournament_text
+from metrics import Metrics, NullMetrics, set_metrics
+
+
+def test_parser_counts_how_each_winner_was_resolved(capsys):
+    metrics = Metrics()
+    previous = set_metrics(metrics)
+    try:
+        matches = process_tournament_text(load_embedded_sample(), preprocess=False)
+    finally:
+        set_metrics(previous)
+
+    resolutions = ["strict", "last_name", "next_round", "fallback_p1"]
+    assert sum(metrics.counter("matches", resolution=name) for name in resolutions) == len(matches) > 0
+    # Per-match lines are only logged when verbose
+    assert " beat " not in capsys.readouterr().out
+    stages = {timer["stage"] for timer in metrics.snapshot()["timers"]}
+    assert {"parse_round_results", "matching"} <= stages
+
+
+def test_verbose_logs_each_match(capsys):
+    previous = set_metrics(Metrics(verbose=True))
+    try:
+        process_tournament_text(load_embedded_sample(), preprocess=False)
+    finally:
+        set_metrics(previous)
+
+    assert " beat " in capsys.readouterr().out
+
+
+def test_json_and_prometheus_export(tmp_path):
+    metrics = Metrics()
+    metrics.observe("extract", 0.5, pdf="2002_QS_M.pdf")
+    metrics.observe("extract", 1.5, pdf="2002_QS_M.pdf")
+    metrics.increment("matches", resolution="strict")
+    metrics.increment("matches", 2, resolution="last_name")
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    snapshot = json.loads((tmp_path / "metrics.json").read_text())
+    assert snapshot["timers"] == [{"stage": "extract", "labels": {"pdf": "2002_QS_M.pdf"},
+                                   "count": 2, "seconds": 2.0, "max_seconds": 1.5}]
+    text = metrics.to_prometheus()
+    assert 'tennis_stage_seconds_sum{pdf="2002_QS_M.pdf",stage="extract"} 2.0' in text
+    assert 'tennis_stage_seconds_count{pdf="2002_QS_M.pdf",stage="extract"} 2' in text
+    assert text.count("# TYPE tennis_matches_total counter") == 1
+    assert 'tennis_matches_total{resolution="last_name"} 2' in text
+
+
+def test_null_metrics_records_nothing():
+    metrics = NullMetrics()
+    with metrics.timer("extract"):
+        metrics.increment("matches")
+
+    assert metrics.snapshot() == {"timers": [], "counters": []}
+
+
+def test_merge_adds_a_worker_snapshot():
+    worker = Metrics()
+    worker.observe("extract", 2.0, pdf="2002_QS_M.pdf")
+    worker.increment("matches", 3, resolution="strict")
+    metrics = Metrics()
+    metrics.observe("extract", 1.0, pdf="2002_QS_M.pdf")
+    metrics.increment("matches", resolution="strict")
+
+    metrics.merge(worker.snapshot())
+
+    timer = metrics.snapshot()["timers"][0]
+    assert (timer["count"], timer["seconds"], timer["max_seconds"]) == (2, 3.0, 2.0)
+    assert metrics.counter("matches", resolution="strict") == 4
+    NullMetrics().merge(worker.snapshot())
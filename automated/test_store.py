@@ -0,0 +1,55 @@
+import csv
+
+from final import CSV_HEADER
+from store import MatchStore, write_to_sqlite
+
+
+def make_row(match_id, round_label, winner, loser, w_scores, l_scores):
+    w_p = [1 if s and s != "retired" else 0 for s in w_scores]
+    l_p = [1 if s else 0 for s in l_scores]
+    return [match_id, round_label, winner, "1", "", "ITA", *w_scores, *w_p, sum(w_p),
+            loser, "", "1", "RUS", *l_scores, *l_p, sum(l_p)]
+
+
+ROWS = [
+    make_row("2004_W_128_1", "R128", "Roberta Vinci", "Lioudmila Skavronskaia",
+             ["6", "3", "retired", "", ""], ["3", "1", "", "", ""]),
+    make_row("2004_W_64_1", "R64", "Roberta Vinci", "Maria Elena Camerin",
+             ["6", "6", "", "", ""], ["4", "2", "", "", ""]),
+]
+
+
+def test_upsert_is_keyed_on_match_id(tmp_path):
+    db_path = str(tmp_path / "matches.db")
+    with MatchStore(db_path, batch_size=1) as store:
+        assert store.upsert(ROWS) == 2
+        corrected = make_row("2004_W_64_1", "R64", "Roberta Vinci", "Maria Elena Camerin",
+                             ["7", "6", "", "", ""], ["5", "2", "", "", ""])
+        store.upsert([corrected])
+
+        assert store.query("PRAGMA journal_mode")[0][0] == "wal"
+        assert store.query("SELECT COUNT(*) FROM matches")[0][0] == 2
+        first = store.query("SELECT * FROM matches WHERE match_id = ?", ("2004_W_128_1",))[0]
+        assert first["w_set1"] == 6 and first["w_set3"] is None and first["retired"] == 1
+        assert (first["year"], first["gender"], first["l_wc"]) == (2004, "W", 1)
+        assert [row["w_set1"] for row in store.player_matches("Roberta Vinci")] == [6, 7]
+        assert len(store.player_matches("Lioudmila Skavronskaia")) == 1
+
+
+def test_lookups_use_indexes(tmp_path):
+    with MatchStore(str(tmp_path / "matches.db")) as store:
+        for column in ["w_name", "l_name", "w_country", "year", "gender", "round"]:
+            plan = store.query(f"EXPLAIN QUERY PLAN SELECT * FROM matches WHERE {column} = ?", ("x",))
+            assert f"idx_matches_{column}" in plan[0]["detail"]
+
+
+def test_import_csv(tmp_path):
+    csv_path = tmp_path / "output.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([CSV_HEADER, *ROWS])
+    db_path = str(tmp_path / "matches.db")
+    write_to_sqlite(ROWS[:1], db_path)
+
+    with MatchStore(db_path) as store:
+        assert store.import_csv(str(csv_path)) == 2
+        assert store.query("SELECT COUNT(*) FROM matches WHERE round = 'R64'")[0][0] == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from final import process_tournament_text
+from metrics import Metrics, set_metrics
+from synthetic import FORMATS, REAL_LAYOUT, generate_draw
+
+
+def parsed(draw):
+    return [(m.match_id, m.round_label, m.winner.name, m.loser.name) for m in
+            process_tournament_text(draw.text, preprocess=False)]
+
+
+def expected(draw):
+    return [(m.match_id, m.round_label, m.winner, m.loser) for m in draw.matches]
+
+
+@pytest.mark.parametrize("formats", FORMATS + (REAL_LAYOUT,))
+def test_parser_recovers_every_winner(formats):
+    draw = generate_draw(64, formats, seed=7, retirement_rate=0.2, walkover_rate=0.1)
+
+    assert len(draw.matches) == 32 + 16 + 8
+    assert parsed(draw) == expected(draw)
+
+
+@pytest.mark.parametrize("size", [32, 1024])
+def test_dotted_scores_round_trip(size):
+    draw = generate_draw(size, "dotted", seed=size, gender="W", retirement_rate=0.2, walkover_rate=0.2)
+    matches = process_tournament_text(draw.text, preprocess=False)
+
+    assert len(matches) == size // 2 + size // 4 + size // 8
+    assert [tuple((s.winner, s.loser) for s in m.sets) for m in matches] == [m.sets for m in draw.matches]
+    assert any(m.sets == () for m in draw.matches)
+    assert any(m.sets and m.sets[-1] == ("retired", "") for m in draw.matches)
+
+
+def test_draws_are_reproducible_and_sizes_checked():
+    assert generate_draw(128, seed=1) == generate_draw(128, seed=1)
+    assert generate_draw(128, seed=1).text != generate_draw(128, seed=2).text
+    assert "(WC) " in generate_draw(128, seed=1, wildcard_rate=0.5).text
+    for size in (16, 96, 2048):
+        with pytest.raises(ValueError):
+            generate_draw(size)
+
+
+def test_ocr_noise_sends_the_parser_to_its_fallbacks():
+    metrics = Metrics()
+    previous = set_metrics(metrics)
+    try:
+        draw = generate_draw(256, REAL_LAYOUT, seed=3, noise=0.3)
+        matches = process_tournament_text(draw.text, preprocess=False)
+    finally:
+        set_metrics(previous)
+
+    assert len(matches) == len(draw.matches)
+    assert metrics.counter("matches", resolution="strict") < len(matches)
@@ -0,0 +1,526 @@
+import csv
+import hashlib
+import os
+import re
+import shutil
+import tarfile
+import threading
+import zipfile
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+import pytest
+
+import text
+from download_meta import load_meta
+from jobs import expand_job_spec
+from journal import Journal
+from url_patterns import UrlPatternCache
+from final import process_tournament_text
+from metrics import Metrics, set_metrics
+from store import MatchStore
+
+DOWNLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "downloads")
+
+
+def test_process_pdf_in_process(tmp_path, monkeypatch):
+    """The default pipeline parses each PDF without spawning final.py"""
+    shutil.copy2(os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf"), tmp_path / "2002_QS_M.pdf")
+    output_file = tmp_path / "output.csv"
+
+    def fail_subprocess(*args, **kwargs):
+        raise AssertionError("subprocess should not be used in the default mode")
+
+    monkeypatch.setattr(text.subprocess, "run", fail_subprocess)
+    text.process_pdf_and_increment(
+        "https://example.invalid/2002_QS_M.pdf", 2002, 2002,
+        output_dir=str(tmp_path), outputs=text.Outputs(output_file=str(output_file))
+    )
+
+    with open(output_file, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("Match Id,Round,W_name")
+    assert len(lines) == 1 + 112
+    assert lines[1].startswith("2002_M_128_1,R128,")
+
+
+def test_pipeline_writes_every_match_of_a_draw(tmp_path, monkeypatch):
+    """Every production path parses the extracted text as one entry per line"""
+    pdf_path = os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf")
+    pdf_text = text.extract_text_from_pdf(pdf_path)
+
+    assert text.process_text_in_process(pdf_text, "2002_QS_M.pdf", text.Outputs(str(tmp_path / "in_process.csv"))) == 112
+    match_rows, _ = text.extract_and_parse_pdf(pdf_path)
+    assert len(match_rows) == 112 and match_rows[0][0] == "2002_M_128_1"
+
+    # The subprocess writes to the caller's outputs, not to the working directory
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "isolated.db")
+    assert text.run_final_in_subprocess(pdf_text, "2002_QS_M.pdf",
+                                      text.Outputs(str(tmp_path / "isolated.csv"), db_path=db_path))
+    assert (tmp_path / "isolated.csv").read_bytes() == (tmp_path / "in_process.csv").read_bytes()
+    assert not (tmp_path / "output.csv").exists()
+    with MatchStore(db_path) as store:
+        assert store.query("SELECT COUNT(*) FROM matches")[0][0] == 112
+
+
+def test_failed_subprocess_is_journaled_as_failed(tmp_path, monkeypatch):
+    pdf_path = os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf")
+    journal = Journal(str(tmp_path / "pipeline.journal.jsonl"))
+
+    def crashing_final(*args, **kwargs):
+        return text.subprocess.CompletedProcess(args[0], 1, stdout="", stderr="Traceback ...")
+
+    monkeypatch.setattr(text.subprocess, "run", crashing_final)
+    result = text.process_downloaded_pdf("2002_QS_M", pdf_path, text.read_pdf_bytes(pdf_path),
+                                         text.Outputs(journal=journal), isolate=True)
+
+    assert result is None
+    assert journal.state("2002_QS_M", "write")["status"] == "failed"
+
+
+class _KeepAliveHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def pdf_server():
+    """Serve the bundled draw PDFs over a local HTTP stand-in"""
+    handler = partial(_KeepAliveHandler, directory=DOWNLOADS_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class _DrawHandler(BaseHTTPRequestHandler):
+    """Serves in-memory files with ETags, conditional GETs and Range requests"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", self.path))
+        body = self.server.files.get(self.path)
+        self.send_response(404 if body is None else 200)
+        self.send_header("Content-Length", "0" if body is None else str(len(body)))
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        files, log = self.server.files, self.server.log
+        body = files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            log.append((304, 0))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        if (m := re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))) and self.headers.get("If-Range") == etag:
+            start = int(m.group(1))
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        self.wfile.write(body[start:])
+        log.append((206 if start else 200, len(body) - start))
+
+
+@pytest.fixture
+def draw_server():
+    """A local stand-in for the draw server; tests edit server.files and read server.log"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DrawHandler)
+    with open(os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf"), "rb") as f:
+        server.files = {"/2002_QS_M.pdf": f.read()}
+    server.log = []
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_refresh_uses_conditional_get(tmp_path, draw_server):
+    url = f"{draw_server.url}/2002_QS_M.pdf"
+    save_path = str(tmp_path / "2002_QS_M.pdf")
+    session = text.create_session()
+    body = draw_server.files["/2002_QS_M.pdf"]
+
+    assert text.download_pdf(url, save_path, session=session)
+    meta = load_meta(save_path)
+    assert meta["content_length"] == len(body)
+    assert meta["sha256"] == hashlib.sha256(body).hexdigest()
+
+    # Unchanged upstream: 304 and no bytes moved
+    assert text.download_pdf(url, save_path, session=session, refresh=True) is True
+    assert draw_server.log[-1] == (304, 0)
+
+    # Corrected upstream: the new draw replaces the old one
+    draw_server.files["/2002_QS_M.pdf"] = body + b"\n%corrected"
+    assert text.download_pdf(url, save_path, session=session, return_data=True, refresh=True) == body + b"\n%corrected"
+    assert load_meta(save_path)["sha256"] == hashlib.sha256(body + b"\n%corrected").hexdigest()
+
+
+def test_interrupted_download_resumes_with_range(tmp_path, draw_server):
+    url = f"{draw_server.url}/2002_QS_M.pdf"
+    save_path = str(tmp_path / "2002_QS_M.pdf")
+    session = text.create_session()
+    body = draw_server.files["/2002_QS_M.pdf"]
+    assert text.download_pdf(url, save_path, session=session)
+
+    # Cut the file short as an interrupted write would
+    with open(save_path, "r+b") as f:
+        f.truncate(1000)
+    assert text.download_pdf(url, save_path, session=session, return_data=True) == body
+    assert draw_server.log[-1] == (206, len(body) - 1000)
+    assert not os.path.exists(save_path + ".part")
+
+
+def test_url_pattern_cache_skips_dead_urls(tmp_path, draw_server, monkeypatch):
+    monkeypatch.setattr(text.time, "sleep", lambda seconds: pytest.fail("a missing URL should not back off"))
+    draw_server.files["/2003_QS_A4.pdf"] = draw_server.files["/2002_QS_M.pdf"]
+    url = f"{draw_server.url}/2003_QS_M.pdf"
+    cache_path = str(tmp_path / "url_patterns.json")
+    session = text.create_session()
+
+    pattern_cache = UrlPatternCache(cache_path)
+    assert text.download_with_alternatives(url, str(tmp_path / "a.pdf"), 2003, session, pattern_cache=pattern_cache)
+    # Both candidates were probed; only the one that exists was fetched
+    assert sorted(draw_server.requests) == [("GET", "/2003_QS_A4.pdf"), ("HEAD", "/2003_QS_A4.pdf"),
+                                            ("HEAD", "/2003_QS_M.pdf")]
+
+    # A later run goes straight to the URL that worked
+    draw_server.requests.clear()
+    pattern_cache = UrlPatternCache(cache_path)
+    assert pattern_cache.working_url("2003_QS_M") == f"{draw_server.url}/2003_QS_A4.pdf"
+    assert pattern_cache.is_dead(url)
+    assert text.download_with_alternatives(url, str(tmp_path / "b.pdf"), 2003, session, pattern_cache=pattern_cache)
+    assert draw_server.requests == [("GET", "/2003_QS_A4.pdf")]
+
+
+def test_only_the_mens_qualifying_draw_has_alternative_urls(tmp_path, draw_server):
+    draw_server.files["/2003_QS_A4.pdf"] = draw_server.files["/2002_QS_M.pdf"]
+    assert text.try_alternative_pdf_urls("https://host/draws/2003_QS_M.pdf", 2003) == [
+        "https://host/draws/2003_QS_A4.pdf"]
+    for event in ("QS_W", "MS", "LS"):
+        assert text.try_alternative_pdf_urls(f"https://host/draws/2003_{event}.pdf", 2003) == []
+
+    # A missing women's draw is not answered with the men's A4 PDF
+    url = f"{draw_server.url}/2003_QS_W.pdf"
+    assert not text.download_with_alternatives(url, str(tmp_path / "w.pdf"), 2003, text.create_session(),
+                                               max_retries=1)
+    assert ("GET", "/2003_QS_A4.pdf") not in draw_server.requests
+
+
+def test_run_jobs_resumes_from_journal(tmp_path, draw_server, monkeypatch):
+    draw_server.files["/2003_QS_M.pdf"] = draw_server.files["/2002_QS_M.pdf"].replace(b"2002", b"2003")
+    jobs = expand_job_spec({"years": "2002-2003", "genders": ["M"], "events": ["QS"],
+                            "url_template": f"{draw_server.url}/{{year}}_{{event}}.pdf"})
+    journal_path = str(tmp_path / "jobs.journal.jsonl")
+    kwargs = dict(output_dir=str(tmp_path / "downloads"), requests_per_second=0)
+    output_file = str(tmp_path / "output.csv")
+
+    # The first write fails, as if the run had crashed there
+    write_to_csv = text.write_to_csv
+    calls = []
+
+    def failing_write(match_rows, output_file):
+        match_rows = list(match_rows)
+        calls.append(output_file)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return write_to_csv(match_rows, output_file)
+
+    monkeypatch.setattr(text, "write_to_csv", failing_write)
+    results = text.run_jobs(jobs, outputs=text.Outputs(output_file, journal=Journal(journal_path)), **kwargs)
+    failed = [key for key, match_count in results.items() if match_count is None]
+    assert len(failed) == 1
+    journal = Journal(journal_path)
+    assert journal.is_done(failed[0], "download") and journal.is_done(failed[0], "parse")
+    assert journal.state(failed[0], "write")["status"] == "failed"
+
+    # The restart re-runs only the write that failed, from the PDF already on disk
+    monkeypatch.setattr(text, "write_to_csv", write_to_csv)
+    draw_server.requests.clear()
+    assert list(text.run_jobs(jobs + jobs, outputs=text.Outputs(output_file, journal=Journal(journal_path)),
+                              **kwargs)) == failed
+    assert draw_server.requests == []
+    assert Journal(journal_path).is_done(failed[0], "write", text.JOURNAL_VERSIONS["write"])
+
+
+def test_run_jobs_refresh_reprocesses_only_changed_draws(tmp_path, draw_server):
+    draw_server.files["/2003_QS_M.pdf"] = draw_server.files["/2002_QS_M.pdf"].replace(b"2002", b"2003")
+    jobs = expand_job_spec({"years": "2002-2003", "genders": ["M"], "events": ["QS"],
+                            "url_template": f"{draw_server.url}/{{year}}_{{event}}.pdf"})
+    journal_path = str(tmp_path / "jobs.journal.jsonl")
+    kwargs = dict(output_dir=str(tmp_path / "downloads"), requests_per_second=0)
+    output_file = str(tmp_path / "output.csv")
+    assert sorted(text.run_jobs(jobs, outputs=text.Outputs(output_file, journal=Journal(journal_path)), **kwargs)) \
+        == ["2002_QS_M", "2003_QS_M"]
+
+    # The 2003 draw is corrected upstream; the 2002 draw is not
+    with open(os.path.join(DOWNLOADS_DIR, "2004_QS_M.pdf"), "rb") as f:
+        draw_server.files["/2003_QS_M.pdf"] = f.read()
+    draw_server.requests.clear()
+    draw_server.log.clear()
+    results = text.run_jobs(jobs, outputs=text.Outputs(output_file, journal=Journal(journal_path)), refresh=True,
+                            **kwargs)
+
+    assert list(results) == ["2003_QS_M"] and results["2003_QS_M"] == 112
+    assert sorted(draw_server.requests) == [("GET", "/2002_QS_M.pdf"), ("GET", "/2003_QS_M.pdf")]
+    assert (304, 0) in draw_server.log
+    entry = Journal(journal_path).state("2003_QS_M", "download")
+    assert entry["sha256"] == hashlib.sha256(draw_server.files["/2003_QS_M.pdf"]).hexdigest()
+
+
+def test_download_many_concurrently(tmp_path, pdf_server):
+    years = [2002, 2003, 2004]
+    jobs = [(f"{pdf_server}/{year}_QS_M.pdf", str(tmp_path / f"{year}_QS_M.pdf"), year) for year in years]
+
+    results = list(text.download_many(jobs, max_workers=3, requests_per_second=0))
+
+    assert sorted(year for _, _, year, success in results if success) == years
+    for year in years:
+        with open(os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf"), "rb") as f:
+            assert (tmp_path / f"{year}_QS_M.pdf").read_bytes() == f.read()
+
+
+def test_download_many_returns_the_downloaded_bytes(tmp_path, pdf_server):
+    jobs = [(f"{pdf_server}/2002_QS_M.pdf", str(tmp_path / "2002_QS_M.pdf"), 2002),
+            (f"{pdf_server}/1999_QS_M.pdf", str(tmp_path / "1999_QS_M.pdf"), 1999)]
+
+    results = {year: data for _, _, year, data in text.download_many(jobs, requests_per_second=0, return_data=True)}
+
+    assert results[2002] == (tmp_path / "2002_QS_M.pdf").read_bytes()
+    assert results[1999] is None
+
+
+def test_download_missing_pdf_does_not_retry(tmp_path, pdf_server, monkeypatch):
+    monkeypatch.setattr(text.time, "sleep", lambda seconds: pytest.fail("404 should not back off"))
+    save_path = str(tmp_path / "1999_QS_M.pdf")
+
+    assert not text.download_pdf(f"{pdf_server}/1999_QS_M.pdf", save_path, session=text.create_session())
+    assert not os.path.exists(save_path)
+
+
+def test_host_rate_limiter_spaces_requests(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(text.time, "sleep", sleeps.append)
+    limiter = text.HostRateLimiter(requests_per_second=10)
+
+    for _ in range(3):
+        limiter.wait("http://example.invalid/a.pdf")
+    limiter.wait("http://other.invalid/a.pdf")
+
+    assert len(sleeps) == 2
+    assert sleeps[1] > sleeps[0] > 0
+
+
+def test_process_pdf_batch_is_ordered(tmp_path):
+    pdf_paths = [os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf") for year in (2004, 2002, 2003)]
+    output_file = tmp_path / "output.csv"
+
+    results = text.process_pdf_batch(pdf_paths, max_workers=2, outputs=text.Outputs(str(output_file)))
+
+    assert [os.path.basename(path) for path, _ in results] == ["2002_QS_M.pdf", "2003_QS_M.pdf", "2004_QS_M.pdf"]
+    assert all(len(match_rows) == 112 for _, match_rows in results)
+    with open(output_file, newline="", encoding="utf-8") as f:
+        match_ids = [row[0] for row in csv.reader(f)][1:]
+    assert len(match_ids) == 3 * 112
+    assert [match_id[:4] for match_id in match_ids[::112]] == ["2002", "2003", "2004"]
+    assert [match_id[:4] for match_id in match_ids] == sorted(match_id[:4] for match_id in match_ids)
+
+
+def test_process_pdf_batch_resumes_from_journal(tmp_path):
+    pdf_paths = [str(tmp_path / f"{year}_QS_M.pdf") for year in (2002, 2003)]
+    for pdf_path in pdf_paths:
+        shutil.copy2(os.path.join(DOWNLOADS_DIR, os.path.basename(pdf_path)), pdf_path)
+    journal_path = str(tmp_path / "batch.journal.jsonl")
+    output_file = str(tmp_path / "output.csv")
+
+    outputs = text.Outputs(output_file, journal=Journal(journal_path))
+    results = text.process_pdf_batch(pdf_paths, max_workers=2, outputs=outputs)
+    assert [len(match_rows) for _, match_rows in results] == [112, 112]
+
+    # Only the PDF that changed since the last run is processed again
+    shutil.copy2(os.path.join(DOWNLOADS_DIR, "2004_QS_M.pdf"), pdf_paths[1])
+    outputs = text.Outputs(output_file, journal=Journal(journal_path))
+    results = text.process_pdf_batch(pdf_paths, max_workers=2, outputs=outputs)
+    assert [path for path, _ in results] == [pdf_paths[1]]
+    assert Journal(journal_path).is_done("2003_QS_M", "write", text.JOURNAL_VERSIONS["write"])
+
+
+def test_batch_stage_timings_reach_the_parent_registry(tmp_path):
+    pdf_paths = [os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf") for year in (2002, 2003)]
+    metrics = Metrics()
+    previous = set_metrics(metrics)
+    try:
+        text.process_pdf_batch(pdf_paths, max_workers=2, outputs=text.Outputs(str(tmp_path / "output.csv")))
+    finally:
+        set_metrics(previous)
+
+    timers = {(timer["stage"], timer["labels"].get("pdf")) for timer in metrics.snapshot()["timers"]}
+    for stage in ("extract", "parse", "write_csv"):
+        assert {(stage, "2002_QS_M.pdf"), (stage, "2003_QS_M.pdf")} <= timers
+    assert metrics.counter("pdfs", status="processed") == 2
+    resolutions = ["strict", "last_name", "next_round", "fallback_p1"]
+    assert sum(metrics.counter("matches", resolution=name) for name in resolutions) == 2 * 112
+
+
+def test_journaled_batch_reads_each_pdf_once(tmp_path, monkeypatch):
+    pdf_paths = [os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf") for year in (2002, 2003)]
+    parent = os.getpid()
+    reads = []
+    read_pdf_bytes = text.read_pdf_bytes
+
+    def read_in_parent_only(pdf_path):
+        if os.getpid() != parent:
+            raise AssertionError("a worker read the PDF again")
+        reads.append(pdf_path)
+        return read_pdf_bytes(pdf_path)
+
+    monkeypatch.setattr(text, "read_pdf_bytes", read_in_parent_only)
+    outputs = text.Outputs(str(tmp_path / "output.csv"), journal=Journal(str(tmp_path / "batch.journal.jsonl")))
+    results = text.process_pdf_batch(pdf_paths, max_workers=2, outputs=outputs,
+                                     cache=text.ExtractionCache(str(tmp_path / "cache")))
+
+    assert [len(match_rows) for _, match_rows in results] == [112, 112]
+    assert reads == pdf_paths
+
+
+def test_process_pdf_batch_goes_on_after_a_failed_pdf(tmp_path, monkeypatch, capsys):
+    pdf_paths = [os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf") for year in (2002, 2003, 2004)]
+    output_file = tmp_path / "output.csv"
+    journal = Journal(str(tmp_path / "batch.journal.jsonl"))
+
+    def parse_all_but_2003(pdf_text, preprocess=True):
+        if "2003" in pdf_text.split("\n", 1)[0]:
+            raise ValueError("unparseable draw")
+        return process_tournament_text(pdf_text, preprocess)
+
+    # The pool's workers are forked after the patch, so they inherit it
+    monkeypatch.setattr(text, "process_tournament_text", parse_all_but_2003)
+    results = text.process_pdf_batch(pdf_paths, max_workers=2, outputs=text.Outputs(str(output_file), journal=journal))
+
+    assert [len(match_rows) for _, match_rows in results] == [112, 0, 112]
+    assert journal.state("2003_QS_M", "write")["status"] == "failed"
+    assert "1 of 3 PDFs failed" in capsys.readouterr().out
+    with open(output_file, newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 1 + 2 * 112
+
+
+def test_layout_extraction_keeps_columns_apart():
+    pdf_text = text.extract_text_from_pdf(os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf"))
+    lines = pdf_text.split("\n")
+
+    # "(WC)" is printed beside its entry and must stay on the same line
+    assert lines[lines.index("First Round") + 2].startswith("(WC) 2. James Fox")
+    # Third Round names are on their own line above the score
+    third_round = lines[lines.index("Third Round") + 1:lines.index("Qualifiers")]
+    assert third_round[:2] == ["J. Morrison [1]", ".......................................6/2 5/7 7/5"]
+
+    matches = process_tournament_text(pdf_text, preprocess=False)
+    assert [m.round_label for m in matches].count("R32") == 16
+    assert len(matches) == 64 + 32 + 16
+
+
+def test_group_rows_joins_fragments_of_a_row():
+    column = [
+        (44.2, 83.8, 203.2, 91.2, "2. James Fox"),
+        (44.2, 78.1, 203.2, 85.5, "1. Jeff Morrison [1]"),
+        (23.4, 83.8, 36.0, 91.2, "(WC)"),
+    ]
+    assert text.group_rows(column) == ["1. Jeff Morrison [1]", "(WC) 2. James Fox"]
+
+
+def test_pdf_year_and_gender_reads_only_the_title(tmp_path):
+    assert text.pdf_year_and_gender(os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf")) == ("2002", "M")
+
+    # Without a metadata title the top band of page 0 is read instead
+    pdf = fitz.open()
+    page = pdf.new_page()
+    page.insert_text((200, 30), "The Championships 2005")
+    page.insert_text((200, 50), "Qualifying Ladies' Singles")
+    page.insert_text((100, 200), "First Round")
+    pdf.save(tmp_path / "draw.pdf")
+    pdf.close()
+
+    assert text.read_pdf_header(str(tmp_path / "draw.pdf")) == ["The Championships 2005", "Qualifying Ladies' Singles"]
+    assert text.pdf_sort_key(str(tmp_path / "draw.pdf")) == (2005, "W", "draw.pdf")
+
+
+def test_extraction_skips_pages_without_draw(tmp_path):
+    source = os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf")
+    pdf = fitz.open(source)
+    pdf.new_page(0)
+    pdf.new_page().insert_text((50, 50), "Notes: (WC) Wild card")
+    pdf.save(tmp_path / "padded.pdf")
+    pdf.close()
+
+    assert text.extract_text_from_pdf(str(tmp_path / "padded.pdf")) == text.extract_text_from_pdf(source)
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_process_pdf_archive_matches_batch(tmp_path, suffix):
+    pdf_paths = [os.path.join(DOWNLOADS_DIR, f"{year}_QS_M.pdf") for year in (2003, 2002)]
+    archive_path = tmp_path / f"draws{suffix}"
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for pdf_path in pdf_paths:
+                archive.write(pdf_path, f"draws/{os.path.basename(pdf_path)}")
+    else:
+        with tarfile.open(archive_path, "w:gz") as archive:
+            for pdf_path in pdf_paths:
+                archive.add(pdf_path, f"draws/{os.path.basename(pdf_path)}")
+
+    batch_csv = tmp_path / "batch.csv"
+    text.process_pdf_batch(pdf_paths, max_workers=2, outputs=text.Outputs(str(batch_csv)))
+    archive_csv = tmp_path / "archive.csv"
+    results = text.process_pdf_archive(str(archive_path), max_workers=2, outputs=text.Outputs(str(archive_csv)))
+
+    assert [name for name, _ in results] == ["draws/2002_QS_M.pdf", "draws/2003_QS_M.pdf"]
+    assert [len(match_rows) for _, match_rows in results] == [112, 112]
+    assert len(archive_csv.read_text(encoding="utf-8").splitlines()) == 1 + 2 * 112
+    assert archive_csv.read_bytes() == batch_csv.read_bytes()
+    # Nothing is unpacked next to the archive
+    assert sorted(os.listdir(tmp_path)) == sorted(["archive.csv", "archive.csv.index.json", "batch.csv",
+                                                   "batch.csv.index.json", archive_path.name])
+
+
+def test_archive_members_without_a_year_are_ordered_by_their_title(tmp_path, monkeypatch):
+    archive_path = tmp_path / "draws.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(os.path.join(DOWNLOADS_DIR, "2004_QS_M.pdf"), "a.pdf")
+        archive.write(os.path.join(DOWNLOADS_DIR, "2002_QS_M.pdf"), "b.pdf")
+    # A local file with a member's name must not be read in its place
+    monkeypatch.chdir(tmp_path)
+    shutil.copy2(os.path.join(DOWNLOADS_DIR, "2003_QS_M.pdf"), tmp_path / "b.pdf")
+
+    assert [name for name, _ in text.iter_archive_pdfs(str(archive_path))] == ["b.pdf", "a.pdf"]
+    assert text.archive_sort_key("b.pdf", lambda: (tmp_path / "b.pdf").read_bytes())[:2] == (2003, "M")
+
+
+@pytest.mark.parametrize("option", ["--archive", "--jobs", "--metrics"])
+def test_cli_option_without_a_value_is_a_usage_error(option):
+    with pytest.raises(SystemExit) as excinfo:
+        text.main([option])
+    assert excinfo.value.code == 2
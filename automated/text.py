@@ -1,62 +1,242 @@
+import argparse
+import bisect
+import hashlib
 import requests
 import fitz  # PyMuPDF
 import os
 import subprocess
+import tarfile
+import zipfile
 from urllib.parse import urlparse, urlunparse
 import re
 import sys
 import time
 import random
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 
-def download_pdf(url, save_path, max_retries=3):
+from requests.adapters import HTTPAdapter
+
+from cache import ExtractionCache, hash_bytes, hash_file
+from columnar import write_to_parquet
+from download_meta import (conditional_headers, load_meta, remove_meta, response_validators, resume_headers,
+                           save_meta)
+from final import (PARSER_VERSION, as_rows, extract_year_and_gender, iter_tournament_matches,
+                   process_tournament_text, write_to_csv)
+from jobs import dedupe_jobs, expand_job_spec, is_parsed, job_key, load_job_spec, url_template_from
+from journal import Journal
+from metrics import Metrics, get_metrics, set_metrics
+from store import write_to_sqlite
+from url_patterns import UrlPatternCache, draw_key
+
+# Bump whenever a change to extract_text_from_pdf changes its output, so
+# cached text from older versions is not reused
+EXTRACTOR_VERSION = "2"
+
+# Version each journal stage is recorded under; a stage finished under another
+# version is run again
+JOURNAL_VERSIONS = {
+    "extract": EXTRACTOR_VERSION,
+    "parse": f"{EXTRACTOR_VERSION}.{PARSER_VERSION}",
+    "write": f"{EXTRACTOR_VERSION}.{PARSER_VERSION}",
+}
+
+# Where processed draws go: the CSV the match rows are appended to, optionally
+# a Parquet dataset and a SQLite match store written alongside it, and
+# optionally a journal of each PDF's stages. Passed as one value so the sinks
+# cannot be swapped by a misordered positional argument.
+Outputs = namedtuple("Outputs", ["output_file", "parquet_dir", "db_path", "journal"],
+                     defaults=("output.csv", None, None, None))
+
+# Other file names a draw has been published under, keyed by its event code
+# (the A4 print version of the men's qualifying draw); other events have none
+ALTERNATIVE_PATTERNS = {
+    "QS_M": ["/{year}_QS_A4.pdf"],
+}
+
+# Browser-like headers to avoid 403 errors
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Referer': 'https://www.wimbledon.com/',
+    'Pragma': 'no-cache',
+    'Cache-Control': 'no-cache'
+}
+
+def create_session(pool_size=8):
+    """
+    Create a requests Session with a connection pool shared by all downloads.
+    
+    Args:
+        pool_size (int): Maximum number of pooled connections per host
+    
+    Returns:
+        requests.Session: Session with the browser-like headers preset
+    """
+    session = requests.Session()
+    session.headers.update(BROWSER_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class HostRateLimiter:
+    """
+    Space out requests to the same host so that at most
+    requests_per_second requests start per second, across all threads.
+    """
+    
+    def __init__(self, requests_per_second=2.0):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+    
+    def wait(self, url):
+        """Block until the next request slot for the URL's host."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def read_pdf_bytes(pdf_path):
+    """
+    Read a PDF into one bytes object, to be shared by hashing and extraction.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+    
+    Returns:
+        bytes: Contents of the file
+    """
+    with open(pdf_path, 'rb') as f:
+        return f.read()
+
+def download_pdf(url, save_path, max_retries=3, session=None, rate_limiter=None, return_data=False,
+                 refresh=False):
     """
     Download a PDF file from the given URL and save it to the specified path.
     Includes browser-like headers and retry logic to overcome 403 errors.
     
+    A sidecar (save_path + ".meta.json") records the ETag, Last-Modified,
+    length and SHA-256 of every downloaded file. A file whose length does not
+    match is resumed rather than trusted, refreshes are conditional GETs that
+    move no bytes when the draw is unchanged (304), and an interrupted
+    download is resumed with a Range request.
+    
     Args:
         url (str): URL of the PDF file to download
         save_path (str): Path where the PDF will be saved
         max_retries (int): Maximum number of retry attempts
+        session (requests.Session): Shared session to reuse pooled connections
+        rate_limiter (HostRateLimiter): Optional per-host rate limiter
+        return_data (bool): Return the PDF's contents instead of True, so the
+            caller can hash and extract it without reading the file back
+        refresh (bool): Ask the server whether an existing file has changed
+            instead of keeping it unconditionally
     
     Returns:
         bool: True if download was successful, False otherwise
+            (with return_data, the PDF as bytes, or None)
     """
-    # Browser-like headers to avoid 403 errors
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Referer': 'https://www.wimbledon.com/',
-        'Pragma': 'no-cache',
-        'Cache-Control': 'no-cache'
-    }
+    http = session if session is not None else requests
+    failed = None if return_data else False
+    part_path = save_path + '.part'
+    
+    def done(data=None):
+        if not return_data:
+            return True
+        return data if data is not None else read_pdf_bytes(save_path)
     
     # Check if the file already exists
+    meta = load_meta(save_path)
     if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
-        print(f"File already exists at {save_path}, skipping download.")
-        return True
+        if meta and meta.get("content_length") not in (None, os.path.getsize(save_path)):
+            # A truncated copy; resume it like an interrupted download
+            print(f"File at {save_path} is incomplete, resuming download.")
+            os.replace(save_path, part_path)
+            save_meta(part_path, meta)
+            remove_meta(save_path)
+            meta = None
+        elif not refresh:
+            print(f"File already exists at {save_path}, skipping download.")
+            return done()
+    else:
+        meta = None
     
     # Try to download with retry logic
     retries = 0
     while retries <= max_retries:
         try:
+            if rate_limiter is not None:
+                rate_limiter.wait(url)
             print(f"Downloading {url} (attempt {retries + 1}/{max_retries + 1})")
-            response = requests.get(url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
             
-            with open(save_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    file.write(chunk)
+            # Byte offsets must match the file, so ask for the raw bytes
+            headers = dict(BROWSER_HEADERS, **{'Accept-Encoding': 'identity'})
+            if meta:
+                headers.update(conditional_headers(meta))
+            part_meta = load_meta(part_path)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if part_meta and part_meta.get("url") == url:
+                headers.update(resume_headers(part_meta, offset))
+            
+            with http.get(url, headers=headers, stream=True, timeout=30) as response:
+                if response.status_code == 304:
+                    print(f"Not modified since last download: {url}")
+                    return done()
+                if response.status_code == 416:
+                    # The partial file does not fit the current upstream file
+                    os.remove(part_path)
+                    remove_meta(part_path)
+                response.raise_for_status()
+                
+                validators = dict(response_validators(response), url=url)
+                digest = hashlib.sha256()
+                chunks = [] if return_data else None
+                if response.status_code == 206 and 'Range' in headers:
+                    print(f"Resuming {url} at byte {offset}")
+                    mode = 'ab'
+                    prefix = read_pdf_bytes(part_path)
+                    digest.update(prefix)
+                    if chunks is not None:
+                        chunks.append(prefix)
+                else:
+                    mode = 'wb'
+                # Record the validators first so an interrupted download can be resumed
+                save_meta(part_path, validators)
+                
+                # Write to a temporary file so an interrupted download never
+                # looks like a complete one
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        file.write(chunk)
+                        digest.update(chunk)
+                        if chunks is not None:
+                            chunks.append(chunk)
+                    size = file.tell()
+                if validators["content_length"] is not None and size != validators["content_length"]:
+                    raise IOError(f"Received {size} of {validators['content_length']} bytes")
+                os.replace(part_path, save_path)
+                save_meta(save_path, dict(validators, content_length=size, sha256=digest.hexdigest()))
+                remove_meta(part_path)
             
             print(f"Successfully downloaded: {url}")
-            return True
+            return done(b''.join(chunks) if chunks is not None else None)
             
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403:
@@ -69,11 +249,11 @@ def download_pdf(url, save_path, max_retries=3):
                     print(f"Found local copy at {scraper_path}, copying to {save_path}")
                     import shutil
                     shutil.copy2(scraper_path, save_path)
-                    return True
+                    return done()
                     
             elif e.response.status_code == 404:
                 print(f"404 Not Found: {url}")
-                return False
+                return failed
                 
             print(f"HTTP error {e.response.status_code} downloading {url}: {e}")
             
@@ -89,113 +269,149 @@ def download_pdf(url, save_path, max_retries=3):
             time.sleep(wait_time)
     
     print(f"Failed to download {url} after {max_retries + 1} attempts")
-    return False
+    return failed
+
+# Column headings of a draw sheet, left to right
+ROUND_HEADERS = ("First Round", "Second Round", "Third Round", "Qualifiers")
 
-def extract_text_from_pdf(pdf_path):
+# Return (x0, y0, x1, y1, text) for every non-empty text line on a page. The
+# page is decoded once, without image data, which the draw does not need.
+def page_text_lines(page):
+    lines = []
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+        for line in block.get("lines", ()):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                lines.append((*line["bbox"], text))
+    return lines
+
+# Return (x_center, y1, header) for the round headings on a line. A line holding
+# several headings is split by character offset.
+def find_round_headers(x0, y0, x1, y1, text):
+    if "Round" not in text and "Qualifiers" not in text:
+        return []
+    found = []
+    for header in ROUND_HEADERS:
+        offset = text.find(header)
+        if offset >= 0:
+            centre = offset + len(header) / 2
+            found.append((x0 + (x1 - x0) * centre / len(text), y1, header))
+    remainder = text
+    for _, _, header in found:
+        remainder = remainder.replace(header, "")
+    # A line that is more than headings (e.g. a title) is not a column heading
+    return found if found and not remainder.strip() else []
+
+def group_rows(column_lines):
+    """
+    Join the fragments of each printed row of a column, left to right.
+    
+    Fragments whose vertical centres are within a quarter line height of each
+    other, such as "(WC)" and the entry it marks, belong to the same row.
+    
+    Args:
+        column_lines (list): (x0, y0, x1, y1, text) tuples of one column
+    
+    Returns:
+        list: The column's rows, top to bottom
+    """
+    rows = []
+    row = []
+    row_centre = row_height = None
+    for x0, y0, x1, y1, text in sorted(column_lines, key=lambda line: (line[1] + line[3], line[0])):
+        centre = (y0 + y1) / 2
+        if row and abs(centre - row_centre) <= min(row_height, y1 - y0) / 4:
+            row.append((x0, text))
+            continue
+        if row:
+            rows.append(" ".join(text for _, text in sorted(row)))
+        row = [(x0, text)]
+        row_centre, row_height = centre, y1 - y0
+    if row:
+        rows.append(" ".join(text for _, text in sorted(row)))
+    return rows
+
+def extract_text_from_pdf(pdf_path, data=None):
     """
-    Extract text from a PDF file with improved formatting for Wimbledon tournament data
-    using PyMuPDF for better extraction results.
+    Extract the draw from a Wimbledon qualifying PDF using the position of each
+    line on the page.
+    
+    Every line is assigned in one pass to the round column whose heading is
+    horizontally closest, and the fragments of a printed row are joined, so
+    neighbouring columns never interleave and "(WC)" markers stay on their
+    entry. Pages without headings continue the columns of the previous page.
+    Each page is decoded at most once: pages with nothing to decode are skipped
+    before decoding, and extraction stops at the first page after the draw
+    that has no entries on it.
     
     Args:
         pdf_path (str): Path to the PDF file
+        data (bytes): Contents of the PDF, if already in memory; PyMuPDF
+            then works on this buffer instead of opening pdf_path
     
     Returns:
-        str: Simplified and cleaned text from the PDF
+        str: The header lines, then each round heading followed by its entries
     """
     try:
-        # Extracted text will be organized into sections
         header_info = []
-        first_round_data = []
-        second_round_data = []
-        third_round_data = []
-        qualifiers_data = []
+        columns = {header: [] for header in ROUND_HEADERS}
+        headers = []
+        draw_started = False
         
-        with fitz.open(pdf_path) as pdf:
-            # First extract header information from the first page
-            if len(pdf) > 0:
-                first_page = pdf[0]
-                # Get the tournament name, year, and event from the first few blocks
-                header_text = first_page.get_text("text").split('\n')[:10]
-                for line in header_text:
-                    if "Championships" in line or "Qualifying" in line or "Round" in line:
-                        header_info.append(line.strip())
-            
-            # Now process all pages to extract player data
-            current_section = None
-            
-            for page_num in range(len(pdf)):
-                page = pdf[page_num]
-                text = page.get_text("text")
-                if not text:
+        with (fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)) as pdf:
+            for page in pdf:
+                # A page with no content stream or no fonts has no text to
+                # decode, e.g. a scanned legend or a blank back page
+                if not page.get_contents() or not page.get_fonts():
                     continue
+                lines = page_text_lines(page)
                 
-                # Split into lines and process each one
-                for line in text.split('\n'):
-                    line = line.strip()
-                    
-                    # Skip empty lines and copyright notice
-                    if not line or "copyright" in line.lower():
-                        continue
-                    
-                    # Determine which section this line belongs to
-                    if "First Round" in line and "Second Round" in line:
-                        # This is a header line, skip it
-                        continue
-                    elif line.startswith("First Round"):
-                        current_section = "first"
-                        continue
-                    elif line.startswith("Second Round"):
-                        current_section = "second"
-                        continue
-                    elif line.startswith("Third Round"):
-                        current_section = "third"
+                page_headers = []
+                entries = []
+                for line in lines:
+                    found = find_round_headers(*line)
+                    if found:
+                        page_headers.extend(found)
+                    else:
+                        entries.append(line)
+                if page_headers:
+                    headers = sorted(page_headers)
+                elif not any(".." in line[4] for line in entries):
+                    # A page that continues the draw has dot-leader entries;
+                    # without them it holds notes or legends
+                    entries = []
+                if not headers:
+                    continue
+                
+                # Columns are split halfway between neighbouring headings
+                boundaries = [(left[0] + right[0]) / 2 for left, right in zip(headers, headers[1:])]
+                top = min(y1 for _, y1, _ in page_headers) if page_headers else 0
+                page_columns = [[] for _ in headers]
+                
+                for line in entries:
+                    x0, y0, x1, y1, text = line
+                    if y1 <= top:
+                        # Title lines above the column headings
+                        if not draw_started and ("Championships" in text or "Qualifying" in text):
+                            header_info.append(text)
                         continue
-                    elif line.startswith("Qualifiers"):
-                        current_section = "qualifiers"
+                    if "copyright" in text.lower():
                         continue
-                    
-                    # Check if line contains player data (starts with a number or (WC))
-                    if re.match(r'^(\d+\.|[(]WC[)]).*', line.strip()):
-                        # Clean up the line format for easier parsing
-                        # Remove multiple spaces
-                        line = re.sub(r'\s{2,}', ' ', line)
-                        
-                        # Add this line to the appropriate section
-                        if current_section == "first":
-                            first_round_data.append(line)
-                        elif current_section == "second":
-                            second_round_data.append(line)
-                        elif current_section == "third":
-                            third_round_data.append(line)
-                        elif current_section == "qualifiers":
-                            qualifiers_data.append(line)
-                    
-                    # Also add lines with match scores (typically start with a player abbrev)
-                    elif re.match(r'^[A-Z]\. [A-Za-z]+.*\d+/\d+', line) or re.match(r'^.*\.\.\.\d+/\d+', line):
-                        if current_section == "second":
-                            second_round_data.append(line)
-                        elif current_section == "third":
-                            third_round_data.append(line)
-                        elif current_section == "qualifiers":
-                            qualifiers_data.append(line)
-        
-        # Build a simplified representation of the tournament data
-        # Start with the header
-        result_lines = header_info.copy()
-        
-        # Add section headers and data
-        result_lines.append("First Round")
-        result_lines.extend(first_round_data)
-        
-        result_lines.append("Second Round")
-        result_lines.extend(second_round_data)
-        
-        result_lines.append("Third Round")
-        result_lines.extend(third_round_data)
-        
-        result_lines.append("Qualifiers")
-        result_lines.extend(qualifiers_data)
+                    page_columns[bisect.bisect(boundaries, (x0 + x1) / 2)].append(line)
+                
+                if not any(page_columns):
+                    if draw_started:
+                        # The draw has ended; what follows is notes and legends
+                        break
+                    continue
+                draw_started = True
+                for (_, _, header), column_lines in zip(headers, page_columns):
+                    columns[header].extend(re.sub(r'\s{2,}', ' ', row) for row in group_rows(column_lines))
         
+        result_lines = header_info
+        for header in ROUND_HEADERS:
+            result_lines.append(header)
+            result_lines.extend(columns[header])
         return "\n".join(result_lines)
     
     except Exception as e:
@@ -204,6 +420,76 @@ def extract_text_from_pdf(pdf_path):
         traceback.print_exc()
         return ""
 
+# Fraction of page 0, from the top, that holds the title lines
+HEADER_BAND = 0.08
+
+def read_pdf_header(pdf_path, data=None):
+    """
+    Read the title lines of a draw (e.g. "The Championships 2002" and
+    "Qualifying Gentlemen's Singles") without extracting the draw.
+    
+    The document title in the PDF metadata is used when it names the event, so
+    no page is decoded at all; otherwise only the top band of page 0 is.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        data (bytes): Contents of the PDF, if already in memory; pdf_path is then not read
+    
+    Returns:
+        list: Title lines, empty if none were found
+    """
+    with (fitz.open(stream=data, filetype="pdf") if data is not None else fitz.open(pdf_path)) as pdf:
+        title = (pdf.metadata or {}).get("title") or ""
+        if "Championships" in title and "Qualifying" in title:
+            return [part.strip() for part in title.split(" - ") if part.strip()]
+        if len(pdf) == 0:
+            return []
+        page = pdf[0]
+        band = fitz.Rect(page.rect.x0, page.rect.y0, page.rect.x1, page.rect.y0 + page.rect.height * HEADER_BAND)
+        header_text = page.get_text("text", clip=band, flags=fitz.TEXTFLAGS_TEXT)
+    return [line.strip() for line in header_text.split('\n')
+            if "Championships" in line or "Qualifying" in line]
+
+def pdf_year_and_gender(pdf_path, data=None):
+    """
+    Return the year and gender of a draw PDF from its title lines alone.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        data (bytes): Contents of the PDF, if already in memory
+    
+    Returns:
+        tuple: (year, gender), e.g. ("2002", "M")
+    """
+    return extract_year_and_gender("\n".join(read_pdf_header(pdf_path, data)))
+
+def extract_text_cached(pdf_path, cache=None, pdf_hash=None, data=None):
+    """
+    Extract text from a PDF, reusing the cached text if the file has not changed.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        cache (ExtractionCache): Cache to use; extraction always runs if None
+        pdf_hash (str): SHA-256 of the PDF, computed if not given
+        data (bytes): Contents of the PDF, if already in memory; it is then
+            hashed and extracted without reading pdf_path
+    
+    Returns:
+        str: Text extracted from the PDF
+    """
+    if cache is None:
+        return extract_text_from_pdf(pdf_path, data)
+    
+    pdf_hash = pdf_hash or (hash_bytes(data) if data is not None else hash_file(pdf_path))
+    pdf_text = cache.get_text(pdf_hash, EXTRACTOR_VERSION)
+    if pdf_text is None:
+        pdf_text = extract_text_from_pdf(pdf_path, data)
+        if pdf_text:
+            cache.put_text(pdf_hash, EXTRACTOR_VERSION, pdf_text)
+    else:
+        print(f"Using cached text for {os.path.basename(pdf_path)}")
+    return pdf_text
+
 def increment_year_in_url(url):
     """
     Increment the year in the URL.
@@ -246,6 +532,10 @@ def try_alternative_pdf_urls(base_url, year):
     """
     Try different URL patterns for the PDF in case the main one fails.
     
+    The alternatives depend on the event and gender in the base URL's file
+    name; only the men's qualifying draw (QS_M) has any, so other draws are
+    never answered with the wrong PDF.
+    
     Args:
         base_url (str): Base URL pattern to try variations of
         year (int): Year to use in the URL
@@ -257,16 +547,16 @@ def try_alternative_pdf_urls(base_url, year):
     parsed_url = urlparse(base_url)
     base_path = parsed_url.path
     
-    # Different patterns that might work
-    patterns = [
-        f"/{year}_QS_A4.pdf"
-    ]
+    # Different patterns that might work, by event code
+    match = re.search(r'/\d{4}_([A-Z]+(?:_[MW])?)\.pdf$', base_path)
+    event = match.group(1) if match else None
+    patterns = [pattern.format(year=year) for pattern in ALTERNATIVE_PATTERNS.get(event, [])]
     
     # Create alternative URLs
     alternatives = []
     for pattern in patterns:
         # Replace the path in the URL
-        new_path = os.path.dirname(base_path) + pattern
+        new_path = os.path.dirname(base_path).rstrip("/") + pattern
         
         alt_url = urlunparse((
             parsed_url.scheme,
@@ -281,82 +571,806 @@ def try_alternative_pdf_urls(base_url, year):
     
     return alternatives
 
-def process_pdf_and_increment(start_url, start_year, end_year, output_dir="downloads"):
+def probe_pdf_urls(urls, session=None, rate_limiter=None, max_workers=4):
+    """
+    Send HEAD requests to several candidate URLs at once.
+    
+    Args:
+        urls (list): URLs to probe
+        session (requests.Session): Shared session to reuse pooled connections
+        rate_limiter (HostRateLimiter): Optional per-host rate limiter
+        max_workers (int): Number of probes in flight at once
+    
+    Returns:
+        dict: Status code for each URL, or None if the probe itself failed
+    """
+    http = session if session is not None else requests
+    
+    def probe(url):
+        if rate_limiter is not None:
+            rate_limiter.wait(url)
+        try:
+            with http.head(url, headers=BROWSER_HEADERS, allow_redirects=True, timeout=10) as response:
+                return response.status_code
+        except requests.exceptions.RequestException as e:
+            print(f"Error probing {url}: {e}")
+            return None
+    
+    if len(urls) <= 1:
+        return {url: probe(url) for url in urls}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return dict(zip(urls, executor.map(probe, urls)))
+
+def download_with_alternatives(url, save_path, year, session=None, rate_limiter=None, max_retries=3,
+                               return_data=False, pattern_cache=None, refresh=False):
+    """
+    Download a draw PDF, falling back to the alternative URL patterns.
+    
+    The URL the draw was last found at is tried first. Otherwise every
+    candidate URL is probed with a concurrent HEAD request; URLs that answer
+    404 or 410, or that pattern_cache already knows to be dead, are dropped
+    without a GET or any backoff, and the rest are downloaded in order.
+    
+    Args:
+        url (str): Primary URL of the PDF
+        save_path (str): Path where the PDF will be saved
+        year (int): Year of the draw, used to build alternative URLs
+        session (requests.Session): Shared session to reuse pooled connections
+        rate_limiter (HostRateLimiter): Optional per-host rate limiter
+        max_retries (int): Maximum number of retry attempts per URL
+        return_data (bool): Return the PDF's contents instead of True
+        pattern_cache (UrlPatternCache): Persisted record of working and dead URLs
+        refresh (bool): Re-check a PDF already on disk with a conditional GET
+            to the URL it was downloaded from, see download_pdf()
+    
+    Returns:
+        bool: True if one of the URLs was downloaded, False otherwise
+            (with return_data, the PDF as bytes, or None)
+    """
+    failed = None if return_data else False
+    key = draw_key(url)
+    
+    def fetch(candidate):
+        result = download_pdf(candidate, save_path, max_retries, session, rate_limiter, return_data, refresh)
+        if result and pattern_cache is not None:
+            pattern_cache.record_working(key, candidate)
+        return result
+    
+    # A file on disk needs no URL discovery; a refresh asks where it came from
+    if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
+        if result := fetch((load_meta(save_path) or {}).get("url", url)):
+            return result
+    
+    known_url = pattern_cache.working_url(key) if pattern_cache is not None else None
+    if known_url is not None:
+        if result := fetch(known_url):
+            return result
+    
+    candidates = [candidate for candidate in dict.fromkeys([url] + try_alternative_pdf_urls(url, year))
+                  if candidate != known_url and not (pattern_cache is not None and pattern_cache.is_dead(candidate))]
+    statuses = probe_pdf_urls(candidates, session, rate_limiter)
+    
+    for candidate in candidates:
+        if statuses[candidate] in (404, 410):
+            print(f"Not found: {candidate}")
+            if pattern_cache is not None:
+                pattern_cache.record_dead(candidate)
+            continue
+        # Anything else, including servers that reject HEAD, is worth a GET
+        print(f"Trying URL: {candidate}")
+        if result := fetch(candidate):
+            return result
+    
+    print(f"No URL pattern worked for {key}")
+    return failed
+
+def download_many(jobs, max_workers=4, requests_per_second=2.0, max_retries=3, session=None,
+                  return_data=False, pattern_cache=None, refresh=False):
+    """
+    Download several draw PDFs concurrently over one pooled session.
+    
+    Jobs are yielded back as soon as their download finishes, so the caller
+    can start extracting files that have arrived while the rest are still
+    in flight.
+    
+    Args:
+        jobs (list): (url, save_path, year) tuples
+        max_workers (int): Number of downloads in flight at once
+        requests_per_second (float): Per-host request rate limit (0 disables it)
+        max_retries (int): Maximum number of retry attempts per URL
+        session (requests.Session): Session to use, one is created if omitted
+        return_data (bool): Yield each PDF's contents (None on failure) in
+            place of success, so it can be extracted without reading it back
+        pattern_cache (UrlPatternCache): Persisted record of working and dead URLs
+        refresh (bool): Re-check PDFs already on disk with a conditional GET
+    
+    Yields:
+        tuple: (url, save_path, year, success) in completion order
+    """
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max_workers)
+    rate_limiter = HostRateLimiter(requests_per_second)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(download_with_alternatives, url, save_path, year, session, rate_limiter,
+                                max_retries, return_data, pattern_cache, refresh): (url, save_path, year)
+                for url, save_path, year in jobs
+            }
+            for future in as_completed(futures):
+                url, save_path, year = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    print(f"Error downloading {url}: {e}")
+                    success = None if return_data else False
+                yield url, save_path, year, success
+    finally:
+        if own_session:
+            session.close()
+
+def run_final_in_subprocess(pdf_text, filename, outputs=Outputs()):
+    """
+    Run final.py on the extracted text in a separate Python interpreter.
+    
+    This is the original isolation mode: every PDF pays for an interpreter
+    start and a fresh import, but a crash in the parser cannot take down the
+    whole batch.
+    
+    Args:
+        pdf_text (str): Text extracted from the PDF
+        filename (str): Name of the PDF, used for log messages
+        outputs (Outputs): Where final.py writes the rows (its journal is not used)
+    
+    Returns:
+        bool: True if final.py ran and exited cleanly
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    final_script_path = os.path.join(script_dir, "final.py")
+    # The extracted text is already one entry per line
+    command = [sys.executable, final_script_path, "--no-preprocess", "--output", outputs.output_file]
+    if outputs.parquet_dir:
+        command += ["--parquet", outputs.parquet_dir]
+    if outputs.db_path:
+        command += ["--sqlite", outputs.db_path]
+    
+    try:
+        print(f"Processing {filename} with final.py...")
+        result = subprocess.run(
+            command,
+            input=pdf_text,  # Pass text directly, subprocess.run will handle encoding
+            capture_output=True,
+            text=True  # This tells subprocess to handle text encoding/decoding
+        )
+        print(f"Processed {filename} with final.py")
+        print(f"Output: {result.stdout}")
+        if result.stderr:
+            print(f"Errors: {result.stderr}")
+        return result.returncode == 0
+    except Exception as e:
+        print(f"Error running final.py on {filename}: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def process_text_in_process(pdf_text, filename, outputs=Outputs(), key=None):
+    """
+    Parse the extracted text with process_tournament_text and write the rows,
+    all inside the current interpreter.
+    
+    Args:
+        pdf_text (str): Text extracted from the PDF
+        filename (str): Name of the PDF, used for log messages
+        outputs (Outputs): Where the rows are written; with a journal, the
+            parse and write stages are recorded under key
+        key (str): Name of the PDF in the journal, e.g. "2002_QS_M"
+    
+    Returns:
+        int: Number of matches written for this PDF (None on error)
+    """
+    output_file, parquet_dir, db_path, journal = outputs
+    match_count = 0
+    parsed = False
+    # Parquet partitions and SQLite batches are written after the CSV, so
+    # matches are only kept when needed
+    kept_matches = [] if parquet_dir or db_path else None
+    
+    def stream_matches():
+        nonlocal match_count, parsed
+        # extract_text_from_pdf already puts one entry per line;
+        # preprocess_text would flatten the rounds again
+        for match in iter_tournament_matches(pdf_text, preprocess=False):
+            match_count += 1
+            if kept_matches is not None:
+                kept_matches.append(match)
+            yield match
+        parsed = True
+        if journal is not None:
+            journal.record(key, "parse", "done", matches=match_count, version=JOURNAL_VERSIONS["parse"])
+    
+    metrics = get_metrics()
+    try:
+        print(f"Processing {filename}...")
+        # Matches are written round by round as they are resolved, so parsing
+        # and the CSV write are timed together
+        with metrics.timer("parse_and_write_csv", pdf=filename):
+            write_to_csv(stream_matches(), output_file)
+        if parquet_dir:
+            with metrics.timer("write_parquet", pdf=filename):
+                write_to_parquet(kept_matches, parquet_dir)
+        if db_path:
+            with metrics.timer("write_sqlite", pdf=filename):
+                write_to_sqlite(kept_matches, db_path)
+        metrics.increment("pdfs", status="processed")
+        if journal is not None:
+            journal.record(key, "write", "done", matches=match_count, version=JOURNAL_VERSIONS["write"])
+        print(f"Processed {filename}: {match_count} matches")
+        return match_count
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+        import traceback
+        traceback.print_exc()
+        if journal is not None:
+            journal.record(key, "write" if parsed else "parse", "failed", error=str(e))
+        return None
+
+def is_finished(journal, key, parse=True):
+    """Return True if the journal shows the PDF fully processed (or, without parse, downloaded)."""
+    if parse:
+        return journal.is_done(key, "write", JOURNAL_VERSIONS["write"])
+    return journal.is_done(key, "download")
+
+def pdf_journal_key(pdf_path):
+    """Name a local PDF or archive member goes by in a journal, e.g. "2002_QS_M"."""
+    return os.path.splitext(os.path.basename(pdf_path))[0]
+
+def is_written(journal, key, pdf_hash):
+    """Return True if the journal shows this exact PDF (by SHA-256) fully processed."""
+    return is_finished(journal, key) and journal.state(key, "write").get("sha256") == pdf_hash
+
+def read_journaled_pdf(journal, key, pdf_path):
+    """
+    Return the PDF a finished download stage left on disk, or None if the
+    stage did not finish or the file no longer matches its recorded SHA-256.
+    """
+    entry = journal.state(key, "download")
+    if entry is None or entry["status"] != "done" or not os.path.exists(pdf_path):
+        return None
+    pdf_data = read_pdf_bytes(pdf_path)
+    return pdf_data if hash_bytes(pdf_data) == entry.get("sha256") else None
+
+def process_downloaded_pdf(key, pdf_path, pdf_data, outputs=Outputs(), isolate=False, cache=None, parse=True):
+    """
+    Extract, parse and write one downloaded PDF, recording each stage.
+    
+    Args:
+        key (str): Name of the PDF in the journal, e.g. "2002_QS_M"
+        pdf_path (str): Path of the PDF
+        pdf_data (bytes): Contents of the PDF
+        outputs (Outputs): Where the rows are written, and the journal of each PDF's stages
+        isolate (bool): Run final.py in a subprocess instead of parsing in-process
+        cache (ExtractionCache): Optional cache of extracted text, keyed by PDF hash
+        parse (bool): False for draws that are only downloaded
+    
+    Returns:
+        int: Number of matches written (0 if not parsed, or parsed by final.py in a subprocess), None on error
+    """
+    journal = outputs.journal
+    filename = os.path.basename(pdf_path)
+    if not parse:
+        print(f"Downloaded {filename}; it is not parsed")
+        return 0
+    
+    # On a restart, text extracted by a finished stage comes from the cache
+    with get_metrics().timer("extract", pdf=filename):
+        pdf_text = extract_text_cached(pdf_path, cache, hash_bytes(pdf_data) if cache is not None else None,
+                                       pdf_data)
+    if not pdf_text:
+        print(f"No text extracted from {filename}")
+        if journal is not None:
+            journal.record(key, "extract", "failed")
+        return None
+    if journal is not None and not journal.is_done(key, "extract", JOURNAL_VERSIONS["extract"]):
+        journal.record(key, "extract", "done", version=JOURNAL_VERSIONS["extract"])
+    
+    if isolate:
+        if not run_final_in_subprocess(pdf_text, filename, outputs):
+            if journal is not None:
+                journal.record(key, "write", "failed", error="final.py failed")
+            return None
+        if journal is not None:
+            journal.record(key, "write", "done", version=JOURNAL_VERSIONS["write"])
+        return 0
+    return process_text_in_process(pdf_text, filename, outputs, key)
+
+def process_pdf_and_increment(start_url, start_year, end_year, output_dir="downloads", isolate=False,
+                              outputs=Outputs(), cache=None, pattern_cache=None):
     """
-    Process PDFs from start_year to end_year, extracting text and running final.py on each.
+    Process PDFs from start_year to end_year, extracting text and parsing each one.
     
     Args:
         start_url (str): Initial URL to download
         start_year (int): Starting year
         end_year (int): Ending year
         output_dir (str): Directory to save downloaded PDFs
+        isolate (bool): Run final.py in a subprocess per PDF instead of calling
+            process_tournament_text directly
+        outputs (Outputs): Where the rows are written; with a journal, a
+            restarted run skips the years already written and the stages
+            already finished
+        cache (ExtractionCache): Optional cache of extracted text, keyed by PDF hash
+        pattern_cache (UrlPatternCache): Persisted record of working and dead URLs
     """
+    journal = outputs.journal
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Get the current script directory to properly locate final.py
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    final_script_path = os.path.join(script_dir, "final.py")
+    if pattern_cache is None:
+        pattern_cache = UrlPatternCache(None)
     
     current_url = start_url
+    session = create_session(pool_size=1)
     
     for year in range(start_year, end_year + 1):
         # Extract year from URL for filename
         filename = f"{year}_QS_M.pdf"  # Default filename pattern
         pdf_path = os.path.join(output_dir, filename)
         
-        print(f"Processing year {year}...")
+        key = os.path.splitext(filename)[0]
+        if journal is not None and is_finished(journal, key):
+            print(f"Skipping year {year}, already processed")
+            current_url = increment_year_in_url(current_url)
+            continue
         
-        # Try to download the PDF
-        success = download_pdf(current_url, pdf_path)
+        print(f"Processing year {year}...")
         
-        # If download failed, try alternative URL patterns
-        if not success:
-            print(f"Failed to download using the primary URL pattern for year {year}")
-            alt_urls = try_alternative_pdf_urls(start_url, year)
-            
-            for alt_url in alt_urls:
-                print(f"Trying alternative URL: {alt_url}")
-                success = download_pdf(alt_url, pdf_path)
-                if success:
-                    current_url = alt_url  # Update the URL pattern if successful
-                    break
+        pdf_data = read_journaled_pdf(journal, key, pdf_path) if journal is not None else None
+        if pdf_data is None:
+            # Try to download the PDF, falling back to the alternative URL patterns.
+            # The downloaded bytes are hashed and extracted in memory
+            pdf_data = download_with_alternatives(current_url, pdf_path, year, session, return_data=True,
+                                                  pattern_cache=pattern_cache)
+            if pdf_data:
+                # Carry on with the URL pattern that worked
+                current_url = pattern_cache.working_url(draw_key(current_url)) or current_url
+            if journal is not None:
+                if pdf_data:
+                    journal.record(key, "download", "done", sha256=hash_bytes(pdf_data), size=len(pdf_data))
+                else:
+                    journal.record(key, "download", "failed")
         
         # Process the PDF if available
-        if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0:
-            # Extract text from the PDF
-            pdf_text = extract_text_from_pdf(pdf_path)
-            
-            if pdf_text:
-                # Run final.py with the extracted text
-                try:
-                    print(f"Processing {filename} with final.py...")
-                    # Fixed: Don't encode the text since subprocess.run will handle the encoding
-                    result = subprocess.run(
-                        [sys.executable, final_script_path],
-                        input=pdf_text,  # Pass text directly, subprocess.run will handle encoding
-                        capture_output=True,
-                        text=True  # This tells subprocess to handle text encoding/decoding
-                    )
-                    print(f"Processed {filename} with final.py")
-                    print(f"Output: {result.stdout}")
-                    if result.stderr:
-                        print(f"Errors: {result.stderr}")
-                except Exception as e:
-                    print(f"Error running final.py on {filename}: {e}")
-                    import traceback
-                    traceback.print_exc()
-            else:
-                print(f"No text extracted from {filename}")
+        if pdf_data:
+            process_downloaded_pdf(key, pdf_path, pdf_data, outputs, isolate=isolate, cache=cache)
         else:
             print(f"Could not process year {year}, no valid PDF available")
         
         # Increment the URL for the next iteration
         current_url = increment_year_in_url(current_url)
+    
+    session.close()
 
-if __name__ == "__main__":
+def run_jobs(jobs, output_dir="downloads", max_workers=4, requests_per_second=2.0, isolate=False,
+             outputs=Outputs(), cache=None, pattern_cache=None, refresh=False):
+    """
+    Download and process draw jobs across a pool of download workers.
+    
+    Jobs are de-duplicated and started in priority order. Each PDF is
+    processed as soon as it has arrived, while later downloads are still in
+    flight. With a journal, every stage of every PDF is recorded: a restarted
+    backfill skips the PDFs already written, reuses PDFs whose download
+    finished, and re-runs only the stages that failed or never ran.
+    
+    With refresh, finished jobs are not skipped: each PDF on disk is checked
+    with a conditional GET, and only the draws that changed upstream are
+    processed again.
+    
+    Args:
+        jobs (list): DrawJob tuples, e.g. from jobs.expand_job_spec()
+        output_dir (str): Directory to save downloaded PDFs
+        max_workers (int): Number of downloads in flight at once
+        requests_per_second (float): Per-host request rate limit
+        isolate (bool): Run final.py in a subprocess per PDF
+        outputs (Outputs): Where the rows are written, and the journal of each PDF's stages
+        cache (ExtractionCache): Optional cache of extracted text, keyed by PDF hash
+        pattern_cache (UrlPatternCache): Persisted record of working and dead URLs
+        refresh (bool): Re-check downloaded PDFs for upstream corrections
+    
+    Returns:
+        dict: Number of matches written for each job run in this call, keyed by
+            job name (0 for draws that are only downloaded, None on failure)
+    """
+    journal = outputs.journal
+    os.makedirs(output_dir, exist_ok=True)
+    
+    jobs = dedupe_jobs(jobs)
+    finished = set()
+    if journal is not None:
+        finished = {job for job in jobs if is_finished(journal, job_key(job), is_parsed(job))}
+        if finished and not refresh:
+            print(f"Skipping {len(finished)} jobs finished in an earlier run")
+            jobs = [job for job in jobs if job not in finished]
+    
+    results = {}
+    
+    def process(job, pdf_path, pdf_data):
+        results[job_key(job)] = process_downloaded_pdf(job_key(job), pdf_path, pdf_data, outputs, isolate=isolate,
+                                                       cache=cache, parse=is_parsed(job))
+    
+    # PDFs whose download finished in an earlier run are processed from disk
+    downloads = []
+    jobs_by_path = {}
+    for job in jobs:
+        pdf_path = os.path.join(output_dir, job.filename)
+        pdf_data = read_journaled_pdf(journal, job_key(job), pdf_path) if journal is not None else None
+        if pdf_data is not None and not refresh:
+            process(job, pdf_path, pdf_data)
+        else:
+            jobs_by_path[pdf_path] = job
+            downloads.append((job.url, pdf_path, job.year))
+    
+    for url, pdf_path, year, pdf_data in download_many(downloads, max_workers, requests_per_second, return_data=True,
+                                                       pattern_cache=pattern_cache, refresh=refresh):
+        job = jobs_by_path[pdf_path]
+        if not pdf_data:
+            print(f"Could not process {os.path.basename(pdf_path)}, no valid PDF available")
+            results[job_key(job)] = None
+            get_metrics().increment("pdfs", status="download_failed")
+            if journal is not None:
+                journal.record(job_key(job), "download", "failed")
+            continue
+        pdf_hash = hash_bytes(pdf_data)
+        if job in finished and (journal.state(job_key(job), "download") or {}).get("sha256") == pdf_hash:
+            print(f"{os.path.basename(pdf_path)} is unchanged upstream")
+            continue
+        if journal is not None:
+            journal.record(job_key(job), "download", "done", sha256=pdf_hash, size=len(pdf_data))
+        process(job, pdf_path, pdf_data)
+    return results
+
+def process_pdfs_concurrently(start_url, start_year, end_year, genders=("M",), output_dir="downloads",
+                              max_workers=4, requests_per_second=2.0, isolate=False, outputs=Outputs(),
+                              cache=None, pattern_cache=None, refresh=False):
+    """
+    Download every year and gender of the qualifying draws in parallel and
+    process each PDF as soon as it has arrived.
+    
+    Args:
+        start_url (str): URL of any year's draw PDF, used as the URL template
+        start_year (int): Starting year
+        end_year (int): Ending year
+        genders (tuple): Genders to fetch ("M", "W")
+        output_dir (str): Directory to save downloaded PDFs
+        max_workers (int): Number of downloads in flight at once
+        requests_per_second (float): Per-host request rate limit
+        isolate (bool): Run final.py in a subprocess per PDF
+        outputs (Outputs): Where the rows are written, and the journal of each PDF's stages (see run_jobs())
+        cache (ExtractionCache): Optional cache of extracted text, keyed by PDF hash
+        pattern_cache (UrlPatternCache): Persisted record of working and dead URLs
+        refresh (bool): Re-check downloaded PDFs for upstream corrections, see run_jobs()
+    
+    Returns:
+        dict: Number of matches written for each draw, see run_jobs()
+    """
+    jobs = expand_job_spec({
+        "years": f"{start_year}-{end_year}",
+        "genders": list(genders),
+        "events": ["QS"],
+        "url_template": url_template_from(start_url),
+    })
+    return run_jobs(jobs, output_dir, max_workers, requests_per_second, isolate=isolate, outputs=outputs,
+                    cache=cache, pattern_cache=pattern_cache, refresh=refresh)
+
+def filename_sort_key(pdf_path):
+    """Return pdf_sort_key() from a name like 2004_QS_M.pdf alone, or None if it has no year and gender."""
+    filename = os.path.basename(pdf_path)
+    match = re.search(r'(\d{4})_[A-Z0-9]+_([MW])', filename)
+    if match:
+        return int(match.group(1)), match.group(2), filename
+    return None
+
+def pdf_sort_key(pdf_path, data=None):
+    """
+    Sort key that orders draw PDFs by year, then gender, then file name.
+    
+    PDFs not named like 2004_QS_M.pdf are ordered by their title lines, read
+    from data when given (e.g. an archive member) and otherwise from pdf_path.
+    
+    Args:
+        pdf_path (str): Path to a PDF named like 2004_QS_M.pdf
+        data (bytes): Contents of the PDF, if already in memory
+    
+    Returns:
+        tuple: (year, gender, filename)
+    """
+    key = filename_sort_key(pdf_path)
+    if key is not None:
+        return key
+    filename = os.path.basename(pdf_path)
+    if data is not None or os.path.exists(pdf_path):
+        # Fall back to the title lines, which are read without extracting the draw
+        year, gender = pdf_year_and_gender(pdf_path, data)
+        return int(year), gender, filename
+    return 0, "", filename
+
+def extract_and_parse_pdf(pdf_path, cache=None, pdf_data=None, pdf_hash=None):
+    """
+    Extract and parse one PDF. Runs inside a worker process.
+    
+    Args:
+        pdf_path (str): Path to the PDF file, or its name inside an archive
+        cache (ExtractionCache): Optional cache of extracted text and parsed rows
+        pdf_data (bytes): Contents of the PDF; read from pdf_path if omitted
+        pdf_hash (str): SHA-256 of pdf_data, if the caller already has it
+    
+    Returns:
+        tuple: (match_rows, metrics snapshot), the rows being empty if nothing
+            could be extracted. The snapshot holds this PDF's stage timings and
+            counters, for the parent to merge into its own registry.
+    """
+    filename = os.path.basename(pdf_path)
+    # A fresh registry per PDF, since a worker process handles many of them
+    metrics = Metrics(verbose=get_metrics().verbose)
+    previous = set_metrics(metrics)
+    try:
+        # The file is read once; hashing and extraction share the buffer
+        if pdf_data is None:
+            pdf_data = read_pdf_bytes(pdf_path)
+        if cache is not None and pdf_hash is None:
+            pdf_hash = hash_bytes(pdf_data)
+        if cache is not None:
+            match_rows = cache.get_rows(pdf_hash, EXTRACTOR_VERSION, PARSER_VERSION)
+            if match_rows is not None:
+                print(f"Using cached rows for {filename}")
+                metrics.increment("cached_rows")
+                return match_rows, metrics.snapshot()
+        
+        with metrics.timer("extract", pdf=filename):
+            pdf_text = extract_text_cached(pdf_path, cache, pdf_hash, pdf_data)
+        if not pdf_text:
+            print(f"No text extracted from {filename}")
+            return [], metrics.snapshot()
+        # Rows rather than Match records cross the process boundary and go in the cache
+        with metrics.timer("parse", pdf=filename):
+            match_rows = as_rows(process_tournament_text(pdf_text, preprocess=False))
+        if cache is not None:
+            cache.put_rows(pdf_hash, EXTRACTOR_VERSION, PARSER_VERSION, match_rows)
+        return match_rows, metrics.snapshot()
+    finally:
+        set_metrics(previous)
+
+def process_pdf_batch(pdf_paths, max_workers=None, outputs=Outputs(), cache=None):
+    """
+    Extract and parse many local PDFs across a process pool.
+    
+    Each PDF is handled by a separate worker; results are written in
+    year/gender order no matter which worker finishes first, so the output
+    is identical to a serial run. A PDF that fails is logged and skipped;
+    the rest of the batch is still written.
+    
+    Args:
+        pdf_paths (list): Paths of the PDFs to process
+        max_workers (int): Number of worker processes (defaults to the CPU count)
+        outputs (Outputs): Where the rows are written; with a journal, each
+            PDF's write is recorded with its SHA-256, and a restarted batch
+            skips the PDFs already written unchanged
+        cache (ExtractionCache): Optional cache of extracted text and parsed rows
+    
+    Returns:
+        list: (pdf_path, match_rows) tuples in year/gender order, for the PDFs
+            processed in this call (match_rows is empty for a PDF that failed)
+    """
+    pdf_paths = sorted(pdf_paths, key=pdf_sort_key)
+    if not pdf_paths:
+        return []
+    # With a journal each PDF is read here, once, to hash it; the worker
+    # gets the bytes and the hash instead of reading the file again
+    pdfs = ((pdf_path, read_pdf_bytes(pdf_path) if outputs.journal is not None else None) for pdf_path in pdf_paths)
+    return run_pdf_pool(pdfs, min(max_workers or os.cpu_count() or 1, len(pdf_paths)), outputs, cache=cache)
+
+def run_pdf_pool(pdfs, max_workers, outputs=Outputs(), cache=None):
+    """
+    Extract and parse PDFs across a process pool and write their rows in order.
+    
+    At most two PDFs per worker are in flight, which bounds memory when the
+    PDFs are passed as bytes. With a journal, PDFs already written unchanged
+    (by SHA-256) are skipped. A PDF that fails is logged and journaled, and
+    the rest are still written.
+    
+    Args:
+        pdfs (iterable): (name, pdf_data) tuples in the order to write them;
+            pdf_data is None for a local file the worker reads itself (only
+            without a journal)
+        max_workers (int): Number of worker processes
+        outputs (Outputs): Where the rows are written, and the optional journal of each PDF's write
+        cache (ExtractionCache): Optional cache of extracted text and parsed rows
+    
+    Returns:
+        list: (name, match_rows) tuples in the order given, for the PDFs
+            processed (match_rows is empty for a PDF that failed)
+    """
+    journal = outputs.journal
+    results = []
+    failed = []
+    pending = deque()
+    
+    def finish_oldest():
+        name, future, pdf_hash = pending.popleft()
+        match_rows = write_batch_rows(name, future, outputs, pdf_hash)
+        if match_rows is None:
+            failed.append(name)
+        results.append((name, match_rows or []))
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for name, pdf_data in pdfs:
+            pdf_hash = hash_bytes(pdf_data) if journal is not None else None
+            if journal is not None and is_written(journal, pdf_journal_key(name), pdf_hash):
+                print(f"Skipping {os.path.basename(name)}, written in an earlier run")
+                continue
+            # Results are taken in submission order, so rows are written
+            # deterministically while later PDFs are still being parsed
+            pending.append((name, executor.submit(extract_and_parse_pdf, name, cache, pdf_data, pdf_hash), pdf_hash))
+            if len(pending) >= 2 * max_workers:
+                finish_oldest()
+        while pending:
+            finish_oldest()
+    if failed:
+        print(f"{len(failed)} of {len(results)} PDFs failed")
+    return results
+
+# Wait for one PDF of a batch and write its rows to the CSV (and Parquet and
+# SQLite) output; with a journal, the outcome is recorded under the PDF's hash.
+# A PDF that fails is logged and returns None, so the rest of the batch goes on.
+def write_batch_rows(pdf_path, future, outputs, pdf_hash=None):
+    output_file, parquet_dir, db_path, journal = outputs
+    key = pdf_journal_key(pdf_path)
+    filename = os.path.basename(pdf_path)
+    metrics = get_metrics()
+    try:
+        match_rows, worker_metrics = future.result()
+        # The worker's extract and parse timings join the parent's registry
+        metrics.merge(worker_metrics)
+        with metrics.timer("write_csv", pdf=filename):
+            write_to_csv(match_rows, output_file)
+        if parquet_dir:
+            with metrics.timer("write_parquet", pdf=filename):
+                write_to_parquet(match_rows, parquet_dir)
+        if db_path:
+            with metrics.timer("write_sqlite", pdf=filename):
+                write_to_sqlite(match_rows, db_path)
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+        import traceback
+        traceback.print_exc()
+        metrics.increment("pdfs", status="failed")
+        if journal is not None:
+            journal.record(key, "write", "failed", sha256=pdf_hash, error=str(e))
+        return None
+    metrics.increment("pdfs", status="processed")
+    if journal is not None:
+        journal.record(key, "write", "done", sha256=pdf_hash, matches=len(match_rows),
+                       version=JOURNAL_VERSIONS["write"])
+    print(f"Processed {filename}: {len(match_rows)} matches")
+    return match_rows
+
+def archive_sort_key(name, read_member):
+    """
+    pdf_sort_key() of an archive member. Members not named like 2004_QS_M.pdf
+    are read with read_member() to get their title lines; the local filesystem
+    is never consulted.
+    """
+    key = filename_sort_key(name)
+    return key if key is not None else pdf_sort_key(name, read_member())
+
+def iter_archive_pdfs(archive_path):
+    """
+    Read the draw PDFs in a zip or tar archive without unpacking it.
+    
+    Members are yielded in year/gender order, each read straight into memory;
+    nothing is written to disk.
+    
+    Args:
+        archive_path (str): Path to a .zip, .tar, .tar.gz, .tgz or .tar.bz2 archive
+    
+    Yields:
+        tuple: (member_name, pdf_data)
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            names = [info.filename for info in archive.infolist()
+                     if not info.is_dir() and info.filename.lower().endswith('.pdf')]
+            keys = {name: archive_sort_key(name, partial(archive.read, name)) for name in names}
+            for name in sorted(names, key=keys.get):
+                yield name, archive.read(name)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path, 'r:*') as archive:
+            members = [member for member in archive.getmembers()
+                       if member.isfile() and member.name.lower().endswith('.pdf')]
+            keys = {member.name: archive_sort_key(member.name, lambda member=member: archive.extractfile(member).read())
+                    for member in members}
+            for member in sorted(members, key=lambda member: keys[member.name]):
+                yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{archive_path} is not a zip or tar archive")
+
+def process_pdf_archive(archive_path, max_workers=None, outputs=Outputs(), cache=None):
+    """
+    Extract and parse every draw PDF in a zip or tar archive across a process pool.
+    
+    Members are read from the archive into memory and handed to the workers
+    as bytes, so no temporary files are created. At most two members per
+    worker are in flight, which bounds memory for large archives. Results are
+    written in year/gender order, as in process_pdf_batch.
+    
+    Args:
+        archive_path (str): Path to the archive
+        max_workers (int): Number of worker processes (defaults to the CPU count)
+        outputs (Outputs): Where the rows are written; with a journal, each
+            member's write is recorded with its SHA-256, and a restarted run
+            skips the members already written unchanged
+        cache (ExtractionCache): Optional cache of extracted text and parsed rows
+    
+    Returns:
+        list: (member_name, match_rows) tuples in year/gender order, for the
+            members processed in this call (match_rows is empty for a member that failed)
+    """
+    return run_pdf_pool(iter_archive_pdfs(archive_path), max_workers or os.cpu_count() or 1, outputs, cache=cache)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download and parse the Wimbledon qualifying draws")
+    mode = parser.add_mutually_exclusive_group()
+    # A job spec is a JSON file of years x genders x events; each PDF's stages
+    # are journaled so an interrupted backfill resumes where it stopped
+    mode.add_argument("--jobs", metavar="SPEC", help="run the draws of a JSON job spec")
+    mode.add_argument("--archive", metavar="PATH",
+                      help="process every PDF in a zip or tar archive without unpacking it")
+    mode.add_argument("--batch", action="store_true", help="re-process every PDF in downloads/ across all cores")
+    parser.add_argument("--isolate", action="store_true", help="run final.py in a separate interpreter for each PDF")
+    parser.add_argument("--refresh", action="store_true",
+                        help="re-check downloaded draws with conditional GETs and re-process the ones that changed")
+    parser.add_argument("--parquet", metavar="DIR", nargs="?", const="output_parquet",
+                        help="also write a year/gender partitioned Parquet dataset (default output_parquet)")
+    parser.add_argument("--sqlite", metavar="PATH", nargs="?", const="matches.db",
+                        help="also upsert the rows into an indexed SQLite match store (default matches.db)")
+    parser.add_argument("--verbose", action="store_true", help="log the outcome of every match")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="save the stage timings and match counters (Prometheus text for .prom, JSON otherwise)")
+    args = parser.parse_args(argv)
+    
     # Starting URL - try various patterns for better success
     initial_url = "https://assets.wimbledon.com/archive/draws/pdfs/draws/2002_QS_M.pdf"
     
-    # Process PDFs from 2002 to 2023 (adjust range as needed)
-    process_pdf_and_increment(initial_url, 2002, 2003, output_dir="downloads")
+    # Extracted text and parsed rows are reused until the PDF or the code changes
+    cache = ExtractionCache(".extraction_cache")
+    metrics = get_metrics()
+    metrics.verbose = args.verbose
+    
+    def outputs(journal_path):
+        return Outputs(parquet_dir=args.parquet, db_path=args.sqlite, journal=Journal(journal_path))
+    
+    if args.jobs:
+        run_jobs(load_job_spec(args.jobs), output_dir="downloads", isolate=args.isolate,
+                 outputs=outputs(f"{args.jobs}.journal.jsonl"), cache=cache,
+                 pattern_cache=UrlPatternCache(".url_patterns.json"), refresh=args.refresh)
+    elif args.archive:
+        # Journaled, so an interrupted run skips the members already written
+        process_pdf_archive(args.archive, outputs=outputs(f"{args.archive}.journal.jsonl"), cache=cache)
+    elif args.batch:
+        process_pdf_batch([str(p) for p in Path("downloads").glob("*.pdf")],
+                          outputs=outputs("batch.journal.jsonl"), cache=cache)
+    else:
+        # Download both genders concurrently
+        # Where each draw was found is remembered across runs, and each PDF's
+        # stages are journaled so an interrupted run resumes where it stopped
+        process_pdfs_concurrently(initial_url, 2002, 2003, genders=("M", "W"), output_dir="downloads",
+                                  isolate=args.isolate, outputs=outputs("pipeline.journal.jsonl"), cache=cache,
+                                  pattern_cache=UrlPatternCache(".url_patterns.json"), refresh=args.refresh)
+    
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from atomic import atomic_write
+
+
+def draw_key(url):
+    """
+    Return the draw a URL is for, e.g. "2002_QS_M" for .../2002_QS_M.pdf.
+
+    Args:
+        url (str): URL of a draw PDF
+
+    Returns:
+        str: File name of the URL without its extension
+    """
+    return os.path.splitext(os.path.basename(urlparse(url).path))[0]
+
+
+class UrlPatternCache:
+    """
+    Persisted record of which draw URLs exist.
+
+    For every draw (year, event and gender, e.g. "2002_QS_M") it remembers the
+    URL the PDF was last found at, and for every URL that answered 404 or 410
+    when it was last seen, so that it is skipped without a request. Dead
+    entries expire after dead_ttl seconds, since draws can be published late.
+    The cache is shared by the download threads and saved after every change;
+    with path=None it is kept in memory only.
+    """
+
+    def __init__(self, path=".url_patterns.json", dead_ttl=7 * 24 * 3600):
+        self.path = path
+        self.dead_ttl = dead_ttl
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self):
+        if self.path is None:
+            return {"working": {}, "dead": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data.get("working"), dict) and isinstance(data.get("dead"), dict):
+                return data
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"working": {}, "dead": {}}
+
+    def _save(self):
+        if self.path is None:
+            return
+        with atomic_write(self.path) as f:
+            json.dump(self.data, f)
+
+    def working_url(self, key):
+        """Return the URL the draw was last downloaded from, or None."""
+        with self._lock:
+            return self.data["working"].get(key)
+
+    def is_dead(self, url):
+        """Return True if the URL answered 404 or 410 within dead_ttl seconds."""
+        with self._lock:
+            seen = self.data["dead"].get(url)
+            return seen is not None and time.time() - seen < self.dead_ttl
+
+    def record_working(self, key, url):
+        """Remember that the draw was downloaded from url."""
+        with self._lock:
+            if self.data["working"].get(key) == url and url not in self.data["dead"]:
+                return
+            self.data["working"][key] = url
+            self.data["dead"].pop(url, None)
+            self._save()
+
+    def record_dead(self, url):
+        """Remember that url does not exist."""
+        with self._lock:
+            self.data["dead"][url] = time.time()
+            for key, working in list(self.data["working"].items()):
+                if working == url:
+                    del self.data["working"][key]
+            self._save()
@@ -1,13 +1,69 @@
-import pandas as pd
+import csv
+import sys
+from itertools import islice
 
-# Specify your CSV file name and the desired XLSX file name
-csv_file = 'output.csv'
-xlsx_file = 'output.xlsx'
+from openpyxl import Workbook
 
-# Read the CSV into a DataFrame
-df = pd.read_csv(csv_file)
 
-# Write the DataFrame to an Excel file
-df.to_excel(xlsx_file, index=False)
+# Convert a CSV cell to the value Excel should store: blank cells stay empty
+# and whole numbers become integers, as pandas' type inference did
+def convert_cell(value):
+    if value == "":
+        return None
+    if value.isdigit():
+        return int(value)
+    return value
 
-print(f"Successfully converted {csv_file} to {xlsx_file}")
+
+def convert_csv_to_xlsx(csv_file, xlsx_file, chunk_size=1000, split_by_year=False):
+    """
+    Stream a CSV file into an XLSX workbook in constant memory.
+
+    Rows are read and written in chunks through openpyxl's write-only mode, so
+    neither the CSV nor the workbook is ever held in memory as a whole.
+
+    Args:
+        csv_file (str): CSV file to read
+        xlsx_file (str): XLSX file to write
+        chunk_size (int): Number of rows read per chunk
+        split_by_year (bool): Write one sheet per year (taken from the Match Id)
+
+    Returns:
+        int: Number of data rows written
+    """
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    row_count = 0
+
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        def sheet_for(row):
+            title = row[0].split("_")[0] if split_by_year and row and row[0] else "Sheet1"
+            if title not in sheets:
+                sheets[title] = workbook.create_sheet(title=title)
+                sheets[title].append(header)
+            return sheets[title]
+
+        while chunk := list(islice(reader, chunk_size)):
+            for row in chunk:
+                sheet_for(row).append([convert_cell(value) for value in row])
+            row_count += len(chunk)
+
+        if not sheets:
+            workbook.create_sheet(title="Sheet1").append(header)
+
+    workbook.save(xlsx_file)
+    return row_count
+
+
+if __name__ == "__main__":
+    # Specify your CSV file name and the desired XLSX file name
+    csv_file = 'output.csv'
+    xlsx_file = 'output.xlsx'
+
+    # Pass --split-by-year to write one sheet per year
+    row_count = convert_csv_to_xlsx(csv_file, xlsx_file, split_by_year="--split-by-year" in sys.argv)
+
+    print(f"Successfully converted {csv_file} to {xlsx_file} ({row_count} rows)")
@@ -1,158 +1,10 @@
-import re
-import csv
 import os
+import sys
 
+# Parses the 2010 Ladies' qualifying draw below (or a draw piped to stdin)
+# with the parser shared with the automated pipeline. Importing this module
+# does no work; the parser is only loaded when the script runs.
 
-# Helper function to generate player abbreviation
-def get_abbreviation(full_name):
-    parts = full_name.strip().split()
-    return f"{parts[0][0]}. {parts[-1]}" if parts else ""
-
-
-# Helper function to clean strings for comparison
-def clean_string(s):
-    return ''.join(s.split()).upper()
-
-
-# Extract year and gender from the input text
-def extract_year_and_gender(text):
-    lines = text.splitlines()
-    year, gender = None, None
-    for line in lines[:5]:
-        if not year and (m := re.search(r'\b\d{4}\b', line)):
-            year = m.group(0)
-        if not gender:
-            gender = "M" if "Gentlemen's" in line else "W" if "Ladies'" in line else None
-        if year and gender:
-            break
-    if not year or not gender:
-        raise ValueError("Year or gender not found")
-    return year, gender
-
-
-# Create pairs of players for matches
-def create_match_pairs(player_list):
-    return [(player_list[i], player_list[i + 1]) for i in range(0, len(player_list) - 1, 2)]
-
-
-# Updated match_player function to handle names correctly with fallback to last name only
-def match_player(winner_abbr, player, fallback_to_last_name=True):
-    # Remove seeding from abbreviation (e.g., [1])
-    winner_abbr = re.sub(r'\s*\[\d+\]', '', winner_abbr).strip()
-    parts = winner_abbr.split()
-
-    # Split into initials and last name
-    if len(parts) >= 2:
-        initials_str = ' '.join(parts[:-1])  # Everything before the last word
-        last_name = parts[-1]  # Last word as the last name
-    else:
-        initials_str = ''
-        last_name = parts[0] if parts else ''
-
-    # Process winner's initials
-    initials_str = initials_str.replace('.', '').upper()
-    winner_initials = []
-    for part in initials_str.split():
-        if '-' in part:
-            winner_initials.extend(p[0] for p in part.split('-') if p)
-        else:
-            winner_initials.append(part[0])
-
-    # Process player's full name
-    player_parts = player["name"].split()
-    if len(player_parts) >= 2:
-        player_last_name = player_parts[-1]  # Last word as the last name
-        player_first_names = player_parts[:-1]  # All preceding words as first names
-    else:
-        player_last_name = player_parts[0] if player_parts else ''
-        player_first_names = []
-
-    # Extract player's initials from first names
-    player_initials = []
-    for fn in player_first_names:
-        if '-' in fn:
-            player_initials.extend(p[0].upper() for p in fn.split('-') if p)
-        else:
-            player_initials.append(fn[0].upper())
-
-    # Match last name and initials
-    last_name_match = clean_string(last_name) == clean_string(player_last_name)
-    initials_match = all(i in player_initials for i in winner_initials)
-
-    # Return True if last names match and initials are a subset or single initial matches
-    if last_name_match:
-        if initials_match or (len(winner_initials) == 1 and len(player_initials) >= 1):
-            return True
-        
-        # Fallback to last name only if requested
-        if fallback_to_last_name:
-            return True
-            
-    return False
-
-
-# Parse round results
-def parse_round_results(section_text):
-    lines = [line.strip() for line in section_text.splitlines() if line.strip()]
-    has_score_lines = any(line.startswith('.') for line in lines)
-    results = []
-
-    if has_score_lines:
-        # Two-line format parsing (unchanged)
-        i = 0
-        while i < len(lines) - 1:
-            if not lines[i].startswith('.') and lines[i + 1].startswith('.'):
-                winner_abbr = lines[i].strip()
-                score_line = lines[i + 1].strip()
-                sets = []
-                if re.search(r'\d+/\d+', score_line):
-                    for sp in score_line.split():
-                        if m := re.search(r'(\d+)/(\d+)', sp):
-                            sets.append((m.group(1), m.group(2)))
-                elif "retired" in score_line.lower():
-                    for sp in re.findall(r'(\d+/\d+)', score_line):
-                        w_score, l_score = sp.split("/")
-                        sets.append((w_score, l_score))
-                    sets.append(("retired",))
-                elif "wo." in score_line.lower() or "def" in score_line.lower():
-                    sets = []
-                else:
-                    sets = []
-                results.append({"winner_abbr": winner_abbr, "sets": sets})
-                i += 2
-            else:
-                i += 1
-    else:
-        # Updated regex for single-line format
-        score_pattern = re.compile(r'^(.+?)\s*\.{2,}\s*(.*)')
-        for line in lines:
-            if m := score_pattern.search(line):
-                winner_abbr = m.group(1).strip()  # e.g., "V. Kutuzova [1]"
-                score_str = m.group(2).strip()    # e.g., "3/6 6/3 6/4"
-                sets = []
-                score_lower = score_str.lower()
-                if "retired" in score_lower:
-                    for sp in re.findall(r'(\d+/\d+)', score_str):
-                        w_score, l_score = sp.split("/")
-                        sets.append((w_score, l_score))
-                    sets.append(("retired",))
-                elif "wo." in score_lower or "def" in score_lower:
-                    sets = []
-                else:
-                    for sp in score_str.split():
-                        if m := re.search(r'(\d+)/(\d+)', sp):
-                            sets.append((m.group(1), m.group(2)))
-                results.append({"winner_abbr": winner_abbr, "sets": sets})
-
-    print(f"Parsed {len(results)} results")
-    return results
-
-# Extract winners from the next round
-def extract_winners_from_next_round(section_text):
-    return [line.strip() for line in section_text.splitlines() if line.strip() and line[0].isalpha()]
-
-
-# Main processing
 input_text = """
 The Championships 2010
 Qualifying Ladies' Singles
@@ -378,133 +230,25 @@ E. Daniilidou
 .............................................6/0 6/0
 This material is the copyright of the All England Lawn Tennis Club and may not be reproduced in any form without written permission.
 """
-year, gender = extract_year_and_gender(input_text)
-round_splits = re.split(r'(First Round|Second Round|Third Round|Qualifiers)', input_text)
-round_data = {}
-order = []
-for i in range(1, len(round_splits), 2):
-    round_name = round_splits[i].strip()
-    round_data[round_name] = round_splits[i + 1].strip()
-    order.append(round_name)
 
-# Updated regex to handle (WC) and (Alt) prefixes
-first_round_pattern = re.compile(
-    r'^(?P<prefix>\((WC|Alt)\))?\s*(?P<num>\d+)\.\s+(?P<name>[^\[\.\n]+)(?:\s*\[(?P<seeding>\d+)\])?.*?\(?\s*(?P<country>[A-Z]{3})\)?',
-    re.IGNORECASE
-)
 
-# Parse First Round players
-players = []
-for line in round_data["First Round"].splitlines():
-    if line.strip() and (match := first_round_pattern.search(line.strip())):
-        # Strip (WC) or (Alt) from the name if present
-        name = match.group("name").strip()
-        prefix = match.group("prefix")
-        # Only set "wild" to "1" for (WC), ignore (Alt)
-        wild = "1" if prefix == "(WC)" else ""
-        players.append({
-            "num": int(match.group("num")),
-            "name": name,
-            "seeding": match.group("seeding") or "",
-            "country": match.group("country").strip(),
-            "wild": wild,
-            "abbrev": get_abbreviation(name)
-        })
-players.sort(key=lambda x: x["num"])
-print(f"Number of players parsed: {len(players)}")
+def main(argv=None):
+    """Parse the draw and update output.csv (and the --sqlite store); see automated/final.py main()."""
+    import importlib.util
 
-# Process matches
-match_result_sections = [r for r in order if r != "First Round"]
-round_mapping = {"Second Round": "R128", "Third Round": "R64", "Qualifiers": "R32"}
-round_num_mapping = {"Second Round": "128", "Third Round": "64", "Qualifiers": "32"}
-match_rows = []
-current_matches = create_match_pairs(players)
+    # The shared parser has the same file name as this script, so it is loaded
+    # from its path under a name of its own rather than imported as "final";
+    # its sibling modules (metrics, csv_index) are found on sys.path
+    automated_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'automated')
+    sys.path.insert(0, automated_dir)
+    spec = importlib.util.spec_from_file_location("automated_final", os.path.join(automated_dir, 'final.py'))
+    parser = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(parser)
 
-for i, section in enumerate(match_result_sections):
-    round_label = round_mapping.get(section, f"R?{section}")
-    round_num = round_num_mapping.get(section, "?")
-    section_text = round_data.get(section, "")
-    results = parse_round_results(section_text)
-    next_winners = extract_winners_from_next_round(round_data.get(match_result_sections[i + 1], "")) if i + 1 < len(
-        match_result_sections) else []
-    expected_matches = len(current_matches)
-    if len(results) != expected_matches:
-        print(
-            f"Warning: Number of results ({len(results)}) in {section} does not match expected matches ({expected_matches})")
-    winners = []
-    match_num = 1
-    for j, (p1, p2) in enumerate(current_matches[:len(results)]):
-        result = results[j]
-        winner_abbr = result["winner_abbr"]
-        sets = result["sets"]
-        
-        # First try with strict matching (no fallback)
-        if match_player(winner_abbr, p1, fallback_to_last_name=False):
-            winner, loser = p1, p2
-            print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']}")
-        elif match_player(winner_abbr, p2, fallback_to_last_name=False):
-            winner, loser = p2, p1
-            print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']}")
-        else:
-            # If strict matching failed, try with fallback to last name only
-            if match_player(winner_abbr, p1, fallback_to_last_name=True):
-                winner, loser = p1, p2
-                print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (matched by last name)")
-            elif match_player(winner_abbr, p2, fallback_to_last_name=True):
-                winner, loser = p2, p1
-                print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (matched by last name)")
-            else:
-                # If even fallback matching fails, try next round information
-                print(f"{section} Match {j + 1}: Cannot match '{winner_abbr}' to {p1['name']} or {p2['name']}")
-                if j < len(next_winners) and next_winners[j]:
-                    if match_player(next_winners[j], p1):
-                        winner, loser = p1, p2
-                        print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (via next round)")
-                    elif match_player(next_winners[j], p2):
-                        winner, loser = p2, p1
-                        print(f"{section} Match {j + 1}: {winner['name']} beat {loser['name']} (via next round)")
-                    else:
-                        winner, loser = p1, p2
-                        print(f"{section} Match {j + 1}: Fallback to {winner['name']} (unmatched '{next_winners[j]}')")
-                else:
-                    winner, loser = p1, p2
-                    print(f"{section} Match {j + 1}: Fallback to {winner['name']} (no next round info)")
-        
-        # Extract set scores
-        w_scores = [sets[k][0] if k < len(sets) else "" for k in range(5)]
-        l_scores = [sets[k][1] if k < len(sets) else "" for k in range(5)]
-        
-        # Calculate set participation (1 if played, 0 if not)
-        w_set_participation = [1 if w_scores[k] and w_scores[k] != "retired" else 0 for k in range(5)]
-        l_set_participation = [1 if l_scores[k] and (len(sets[k]) > 1 if k < len(sets) else False) else 0 for k in range(5)]
-        
-        # Calculate total sets played
-        w_set = sum(w_set_participation)
-        l_set = sum(l_set_participation)
-        
-        match_id_str = f"{year}_{gender}_{round_num}_{match_num}"
-        match_rows.append([
-            match_id_str, round_label, winner["name"], winner["seeding"], winner["wild"], winner["country"],
-            *w_scores, *w_set_participation, w_set,
-            loser["name"], loser["seeding"], loser["wild"], loser["country"],
-            *l_scores, *l_set_participation, l_set
-        ])
-        match_num += 1
-        winners.append(winner)
-    current_matches = create_match_pairs(winners)
+    argv = sys.argv[1:] if argv is None else argv
+    # Draws given to this script are already one entry per line
+    return parser.main(["--no-preprocess", *argv], default_text=input_text)
 
-# Write to CSV
-if not os.path.exists("output.csv"):
-    with open("output.csv", "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Match Id", "Round", "W_name", "W_seed", "W_Wc", "W_country",
-                         "W_set1", "W_set2", "W_set3", "W_set4", "W_set5",
-                         "W_set1_p", "W_set2_p", "W_set3_p", "W_set4_p", "W_set5_p", "W_set",
-                         "L_name", "L_seed", "L_Wc", "L_country",
-                         "L_set1", "L_set2", "L_set3", "L_set4", "L_set5",
-                         "L_set1_p", "L_set2_p", "L_set3_p", "L_set4_p", "L_set5_p", "L_set"])
-with open("output.csv", "a", newline="") as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerows(match_rows)
 
-print("CSV file 'output.csv' has been updated with set participation and total sets columns.")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())